@@ -0,0 +1,85 @@
+"""
+Perfil de arranque: tiempo de importación por módulo.
+
+Se activa con INVENTARIO_PERFIL_ARRANQUE=1 al levantar inventario/wsgi.py o asgi.py
+y escribe en stderr los módulos más lentos (tiempo propio, sin contar sus imports).
+Es solo diagnóstico: envuelve los loaders de importlib mientras está activo.
+
+No importa Django a nivel de módulo para poder medir también su importación.
+"""
+import importlib.abc
+import os
+import sys
+import time
+
+_tiempos: dict[str, tuple[float, float]] = {}  # módulo → (propio, total) en segundos
+_pila: list[float] = []
+_inicio = None
+
+
+class _LoaderMedido(importlib.abc.Loader):
+    def __init__(self, loader):
+        self._loader = loader
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        inicio = time.perf_counter()
+        _pila.append(0.0)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            hijos = _pila.pop()
+            total = time.perf_counter() - inicio
+            _tiempos[module.__name__] = (total - hijos, total)
+            if _pila:
+                _pila[-1] += total
+
+    def __getattr__(self, nombre):
+        # get_source, get_resource_reader, etc. del loader original
+        return getattr(self._loader, nombre)
+
+
+class _FinderMedido(importlib.abc.MetaPathFinder):
+    def find_spec(self, nombre, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(nombre, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _LoaderMedido(spec.loader)
+            return spec
+        return None
+
+
+_finder = _FinderMedido()
+
+
+def activo() -> bool:
+    return os.environ.get("INVENTARIO_PERFIL_ARRANQUE", "") in ("1", "true", "True")
+
+
+def iniciar() -> None:
+    """Empieza a medir importaciones (si el perfil está activo)."""
+    global _inicio
+    if activo() and _finder not in sys.meta_path:
+        _inicio = time.perf_counter()
+        sys.meta_path.insert(0, _finder)
+
+
+def terminar(top: int = 25) -> None:
+    """Deja de medir y reporta los `top` módulos más lentos en stderr."""
+    if _finder not in sys.meta_path:
+        return
+    sys.meta_path.remove(_finder)
+    total = time.perf_counter() - _inicio
+
+    lineas = [f"[arranque] {len(_tiempos)} módulos importados en {total * 1000:.1f} ms"]
+    lineas.append(f"[arranque] {'propio ms':>10} {'total ms':>10}  módulo")
+    ordenados = sorted(_tiempos.items(), key=lambda item: item[1][0], reverse=True)
+    for modulo, (propio, acumulado) in ordenados[:top]:
+        lineas.append(f"[arranque] {propio * 1000:10.1f} {acumulado * 1000:10.1f}  {modulo}")
+    print("\n".join(lineas), file=sys.stderr)
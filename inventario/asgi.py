@@ -9,8 +9,18 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+from inventario import arranque
+
+# INVENTARIO_PERFIL_ARRANQUE=1 → reporta en stderr el tiempo de import por módulo
+arranque.iniciar()
+
+from django.core.asgi import get_asgi_application  # noqa: E402
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventario.settings')
+# Workers nuevos calientan serializers y URLs antes del primer request. Las conexiones
+# no: las vistas sync corren en el hilo del executor de asgiref, no en este.
+os.environ.setdefault('INVENTARIO_CALENTAR', '1')
 
 application = get_asgi_application()
+
+arranque.terminar()
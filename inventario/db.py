@@ -0,0 +1,82 @@
+"""
+Perfiles de base de datos configurables por variables de entorno (.env).
+
+    DB_ENGINE=sqlite | mysql            (por defecto sqlite)
+    DB_CONN_MAX_AGE=60                  segundos de conexión persistente (0 = una por request)
+    DB_CONN_HEALTH_CHECKS=True          valida la conexión persistente antes de reutilizarla
+    SQLITE_TUNING=True                  WAL + pragmas (False = modo por defecto de SQLite, para comparar)
+    SQLITE_BUSY_TIMEOUT=20              segundos esperando un lock antes de "database is locked"
+    MYSQL_ISOLATION_LEVEL=read committed
+    DB_REPLICA_HOST=...                 (solo MySQL) habilita el alias "replica" para lecturas
+
+SQLite se abre en WAL con synchronous=NORMAL: los lectores no bloquean al escritor
+y las escrituras se serializan con BEGIN IMMEDIATE en vez de fallar a mitad de transacción.
+"""
+from decouple import config
+
+
+def _comunes() -> dict:
+    return {
+        "CONN_MAX_AGE": config("DB_CONN_MAX_AGE", default=60, cast=int),
+        "CONN_HEALTH_CHECKS": config("DB_CONN_HEALTH_CHECKS", default=True, cast=bool),
+    }
+
+
+def _sqlite(base_dir) -> dict:
+    if not config("SQLITE_TUNING", default=True, cast=bool):
+        return {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": base_dir / "db.sqlite3",
+            **_comunes(),
+            # journal_mode queda guardado en el archivo: volver explícitamente a rollback journal
+            "OPTIONS": {"init_command": "PRAGMA journal_mode=DELETE;"},
+        }
+    return {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": base_dir / "db.sqlite3",
+        **_comunes(),
+        "OPTIONS": {
+            # sqlite3.connect(timeout=...) es el busy_timeout de SQLite
+            "timeout": config("SQLITE_BUSY_TIMEOUT", default=20, cast=int),
+            "transaction_mode": "IMMEDIATE",
+            "init_command": (
+                "PRAGMA journal_mode=WAL;"
+                "PRAGMA synchronous=NORMAL;"
+                "PRAGMA temp_store=MEMORY;"
+            ),
+        },
+    }
+
+
+def _mysql(host: str) -> dict:
+    return {
+        "ENGINE": "django.db.backends.mysql",
+        "NAME": config("DB_NAME"),
+        "USER": config("DB_USER"),
+        "PASSWORD": config("DB_PASSWORD", default=""),
+        "HOST": host,
+        "PORT": config("DB_PORT", default="3306"),
+        **_comunes(),
+        "OPTIONS": {
+            "charset": "utf8mb4",
+            "isolation_level": config("MYSQL_ISOLATION_LEVEL", default="read committed"),
+            "init_command": "SET sql_mode='STRICT_TRANS_TABLES'",
+        },
+    }
+
+
+def databases(base_dir) -> dict:
+    """Construye settings.DATABASES según DB_ENGINE."""
+    engine = config("DB_ENGINE", default="sqlite").lower()
+    if engine == "sqlite":
+        return {"default": _sqlite(base_dir)}
+    if engine != "mysql":
+        raise ValueError(f"DB_ENGINE no soportado: {engine}")
+
+    dbs = {"default": _mysql(config("DB_HOST", default="localhost"))}
+    replica = config("DB_REPLICA_HOST", default="")
+    if replica:
+        dbs["replica"] = _mysql(replica)
+        # Las réplicas no reciben migraciones ni se usan como test DB independiente.
+        dbs["replica"]["TEST"] = {"MIRROR": "default"}
+    return dbs
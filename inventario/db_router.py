@@ -0,0 +1,54 @@
+"""
+Ruteo de lecturas a la réplica.
+
+Solo se leen desde "replica" las consultas hechas dentro de un request GET/HEAD
+(marcado por LecturaReplicaMiddleware). Todo lo demás —POST con validación de stock,
+admin, comandos— lee y escribe en "default" para no ver datos atrasados por el lag.
+
+Sesiones, usuarios/grupos, revocaciones de JWT y claves de idempotencia se leen
+siempre de "default", incluso en un GET: con lag, un login recién hecho se vería
+anónimo y un logout o un usuario deshabilitado seguirían vigentes.
+"""
+from contextvars import ContextVar
+
+from django.conf import settings
+
+_usar_replica: ContextVar[bool] = ContextVar("usar_replica", default=False)
+
+_APPS_SIEMPRE_DEFAULT = {"sessions", "auth"}
+_MODELOS_SIEMPRE_DEFAULT = {"inventario_core.tokenrevocado", "inventario_core.claveidempotencia"}
+
+
+class LecturaReplicaMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _usar_replica.set(request.method in ("GET", "HEAD"))
+        try:
+            return self.get_response(request)
+        finally:
+            _usar_replica.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if (
+            not _usar_replica.get()
+            or "replica" not in settings.DATABASES
+            or model._meta.app_label in _APPS_SIEMPRE_DEFAULT
+            or model._meta.label_lower in _MODELOS_SIEMPRE_DEFAULT
+            or model._meta.label_lower == settings.AUTH_USER_MODEL.lower()
+        ):
+            return "default"
+        return "replica"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Misma base de datos física: las relaciones entre alias son válidas.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
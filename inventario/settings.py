@@ -10,10 +10,13 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+from importlib.util import find_spec
 from pathlib import Path
 from decouple import config
 from datetime import timedelta
 
+from inventario.db import databases
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -34,6 +37,8 @@ ALLOWED_HOSTS = []
 
 
 MIDDLEWARE = [
+    # Primero: comprime la respuesta final (brotli/gzip según Accept-Encoding)
+    'inventario_core.middleware.CompresionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -41,6 +46,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'inventario.db_router.LecturaReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'inventario.urls'
@@ -128,20 +134,27 @@ INSTALLED_APPS = [
     'rest_framework',
 ]
 
+# PERFIL=produccion quita el BrowsableAPIRenderer (HTML pesado, útil solo para demo)
+PERFIL = config("PERFIL", default="desarrollo")
+
+API_RENDERERS = ["rest_framework.renderers.JSONRenderer"]
+if find_spec("msgpack"):
+    # Opt-in del cliente: Accept: application/msgpack o ?format=msgpack
+    API_RENDERERS.append("inventario_core.renderers.MessagePackRenderer")
+if PERFIL != "produccion":
+    API_RENDERERS.append("rest_framework.renderers.BrowsableAPIRenderer")
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         # Browsable API con sesión (útil si entrarás por /admin)
         "rest_framework.authentication.SessionAuthentication",
-        # JWT para Postman / clientes
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        # JWT para Postman / clientes: usuario y roles desde los claims, sin leer User
+        "inventario_core.authentication.TokenRolAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
-    "DEFAULT_RENDERER_CLASSES": (
-        "rest_framework.renderers.JSONRenderer",
-        "rest_framework.renderers.BrowsableAPIRenderer",  # útil para demo
-    ),
+    "DEFAULT_RENDERER_CLASSES": API_RENDERERS,
     # Handler simple y seguro (lo creamos más abajo)
     "EXCEPTION_HANDLER": "inventario_core.api_exceptions.custom_exception_handler"
 }
@@ -149,18 +162,40 @@ REST_FRAMEWORK = {
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
+    "TOKEN_OBTAIN_SERIALIZER": "inventario_core.serializers.RolTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "inventario_core.serializers.RolTokenRefreshSerializer",
 }
 
+# Cada cuánto cada proceso recarga la lista de JWT revocados
+REVOCACION_CACHE_SEGUNDOS = 30
+
+# Vigencia de las Idempotency-Key guardadas (ver inventario_core/idempotencia.py)
+IDEMPOTENCIA_TTL = timedelta(hours=24)
+
+# Respaldo de la caché de sugerencias de reposición (se invalida con cada movimiento)
+REPOSICION_CACHE_TTL = 900
+
+# Límites de /productos/ y /movimientos/ (ver inventario_core/gobernador.py)
+GOBERNADOR = {
+    "PAGINA_DEFECTO": 100,
+    "PAGINA_MAXIMA": 500,
+    "BUSQUEDA_MIN_CARACTERES": 3,
+    "TIMEOUT_CONSULTA_MS": 2000,
+    # rol → (capacidad del balde, tokens por segundo)
+    "TASAS_POR_ROL": {
+        "Administrador": (300, 20),
+        "Vendedor": (120, 5),
+        "Consultor": (60, 2),
+        "otros": (30, 1),
+    },
+}
+
+# Warm-up en AppConfig.ready (wsgi.py / asgi.py lo activan; ver inventario_core/calentamiento.py)
+CALENTAR_ARRANQUE = config("INVENTARIO_CALENTAR", default=False, cast=bool)
+# Abrir también las conexiones a la BD: solo wsgi.py, donde el hilo que arranca es el que atiende
+CALENTAR_CONEXIONES = config("INVENTARIO_CALENTAR_CONEXIONES", default=False, cast=bool)
+
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-#        'ENGINE': 'django.db.backends.mysql',
-#        'NAME': config('DB_NAME'),
-#        'USER': config('DB_USER'),
-#        'PASSWORD': config('DB_PASSWORD', default=''),
-#        'HOST': config('DB_HOST', default='localhost'),
-#        'PORT': config('DB_PORT', default='3306'),
-    }
-}
\ No newline at end of file
+# Perfil de conexión (SQLite WAL / MySQL + réplica) → ver inventario/db.py
+DATABASES = databases(BASE_DIR)
+DATABASE_ROUTERS = ["inventario.db_router.ReplicaRouter"]
@@ -5,7 +5,7 @@ from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 from inventario_core.views import (
     CategoriaViewSet, ProveedorViewSet, BodegaViewSet,
-    ProductoViewSet, MovimientoViewSet
+    ProductoViewSet, MovimientoViewSet, ReporteViewSet, JWTLogoutView
 )
 
 router = DefaultRouter()
@@ -14,6 +14,7 @@ router.register(r"proveedores", ProveedorViewSet, basename="proveedores")
 router.register(r"bodegas", BodegaViewSet, basename="bodegas")
 router.register(r"productos", ProductoViewSet, basename="productos")
 router.register(r"movimientos", MovimientoViewSet, basename="movimientos")
+router.register(r"reportes", ReporteViewSet, basename="reportes")
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -21,4 +22,5 @@ urlpatterns = [
     # Endpoints JWT
     path("auth/jwt/create/", TokenObtainPairView.as_view(), name="jwt_create"),
     path("auth/jwt/refresh/", TokenRefreshView.as_view(), name="jwt_refresh"),
+    path("auth/jwt/logout/", JWTLogoutView.as_view(), name="jwt_logout"),
 ]
@@ -9,8 +9,18 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 
 import os
 
-from django.core.wsgi import get_wsgi_application
+from inventario import arranque
+
+# INVENTARIO_PERFIL_ARRANQUE=1 → reporta en stderr el tiempo de import por módulo
+arranque.iniciar()
+
+from django.core.wsgi import get_wsgi_application  # noqa: E402
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventario.settings')
+# Workers nuevos calientan serializers, URLs y conexiones antes del primer request
+os.environ.setdefault('INVENTARIO_CALENTAR', '1')
+os.environ.setdefault('INVENTARIO_CALENTAR_CONEXIONES', '1')
 
 application = get_wsgi_application()
+
+arranque.terminar()
@@ -3,14 +3,24 @@ from rest_framework.views import exception_handler
 from rest_framework.response import Response
 from rest_framework import status
 
+from .gobernador import consulta_interrumpida
+
 
 def custom_exception_handler(exc, context):
     """
-    Formatea Django ValidationError como 400 limpio en toda la API.
+    Formatea Django ValidationError como 400 limpio en toda la API
+    y las consultas cortadas por timeout como 503.
     Delega el resto al handler por defecto de DRF.
     """
     if isinstance(exc, DjangoValidationError):
         return Response({"detail": exc.messages}, status=status.HTTP_400_BAD_REQUEST)
 
+    # Consulta cortada por el timeout del gobernador (ver gobernador.py)
+    if consulta_interrumpida(exc):
+        return Response(
+            {"detail": "La consulta excedió el tiempo máximo. Acote la búsqueda o use paginación."},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
     response = exception_handler(exc, context)
     return response
@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class InventarioCoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'inventario_core'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (registra receivers)
+
+        # Solo en workers (wsgi.py / asgi.py); manage.py y los tests no calientan.
+        if getattr(settings, "CALENTAR_ARRANQUE", False):
+            from .calentamiento import calentar
+            calentar()
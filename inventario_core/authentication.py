@@ -0,0 +1,106 @@
+"""
+Autenticación JWT sin consultas por request.
+
+JWTAuthentication de simplejwt lee la fila User en cada request. Para clientes
+máquina-a-máquina que llaman miles de veces por minuto, TokenRolAuthentication
+arma el usuario desde los claims (ver RolTokenObtainPairSerializer) y
+RolCompositePermission lee los roles del token.
+
+Revocación (logout, usuario deshabilitado, cambio de grupos o de is_staff /
+is_superuser; ver signals.py) en TokenRevocado, cacheada en memoria del proceso y
+recargada cada settings.REVOCACION_CACHE_SEGUNDOS: una consulta por intervalo, no
+por request. El refresh también se valida (RolTokenRefreshSerializer), así que el
+usuario debe volver a iniciar sesión para obtener tokens con sus roles nuevos.
+
+Tokens emitidos antes de estos claims (sin "roles") siguen funcionando por el
+camino normal con lectura de User.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import TokenRevocado
+
+
+class UsuarioToken(TokenUser):
+    """Usuario reconstruido desde el token; `roles` reemplaza a user.groups."""
+    @cached_property
+    def roles(self) -> frozenset:
+        return frozenset(self.token.get("roles", ()))
+
+
+# ───────────────────────────────────────────────────────────────────
+# Revocaciones (caché en memoria del proceso)
+# ───────────────────────────────────────────────────────────────────
+_revocaciones = {"vence": 0.0, "sids": frozenset(), "usuarios": {}}
+_lock = threading.Lock()
+
+
+def _vigentes() -> dict:
+    if time.monotonic() < _revocaciones["vence"]:
+        return _revocaciones
+    with _lock:
+        if time.monotonic() >= _revocaciones["vence"]:
+            sids, usuarios = set(), {}
+            for sid, usuario_id, creado in TokenRevocado.objects.filter(
+                expira__gt=timezone.now()
+            ).values_list("sid", "usuario_id", "creado"):
+                if sid:
+                    sids.add(sid)
+                if usuario_id:
+                    usuarios[usuario_id] = max(usuarios.get(usuario_id, 0), creado.timestamp())
+            _revocaciones.update(
+                sids=frozenset(sids),
+                usuarios=usuarios,
+                vence=time.monotonic() + getattr(settings, "REVOCACION_CACHE_SEGUNDOS", 30),
+            )
+    return _revocaciones
+
+
+def _revocar(**campos) -> None:
+    ahora = timezone.now()
+    # Pasado este plazo ya no existe ningún refresh ni access derivado al que aplique.
+    expira = ahora + api_settings.REFRESH_TOKEN_LIFETIME + api_settings.ACCESS_TOKEN_LIFETIME
+    TokenRevocado.objects.filter(expira__lte=ahora).delete()
+    TokenRevocado.objects.create(creado=ahora, expira=expira, **campos)
+    _revocaciones["vence"] = 0.0  # recargar en este proceso; los demás, al vencer su caché
+
+
+def revocar_sesion(sid: str) -> None:
+    """Logout: invalida el refresh de la sesión y sus access tokens."""
+    _revocar(sid=sid)
+
+
+def revocar_usuario(usuario_id) -> None:
+    """Usuario deshabilitado, eliminado o con permisos cambiados: invalida todos sus tokens emitidos hasta ahora."""
+    _revocar(usuario_id=str(usuario_id))
+
+
+def revocado(token) -> bool:
+    vigentes = _vigentes()
+    if token.get("sid") in vigentes["sids"]:
+        return True
+    desde = vigentes["usuarios"].get(str(token.get(api_settings.USER_ID_CLAIM)))
+    if desde is None:
+        return False
+    login = token.get("login", token.get("iat", 0))
+    return login <= desde
+
+
+# ───────────────────────────────────────────────────────────────────
+# Autenticación
+# ───────────────────────────────────────────────────────────────────
+class TokenRolAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if revocado(validated_token):
+            raise AuthenticationFailed("El token fue revocado.", code="token_revoked")
+        if "roles" not in validated_token:
+            return super().get_user(validated_token)
+        return UsuarioToken(validated_token)
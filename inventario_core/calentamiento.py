@@ -0,0 +1,79 @@
+"""
+Warm-up de workers (se ejecuta desde InventarioCoreConfig.ready si settings.CALENTAR_ARRANQUE).
+
+Lo que de otro modo paga el primer request de cada worker nuevo:
+- Introspección de serializers DRF (cachés de _meta de modelos, validadores, traducciones).
+- Clases perezosas de api_settings (renderers, auth, permisos, exception handler).
+- Carga del URLconf, poblado del resolver y compilación de las regex de cada ruta.
+- Conexiones a la BD de cada alias (persistentes con CONN_MAX_AGE > 0), solo si
+  settings.CALENTAR_CONEXIONES.
+
+Las conexiones son por hilo: solo sirven cuando el hilo que arranca la app es el que
+atiende requests (workers sync de gunicorn, wsgi.py). Con ASGI las vistas sync corren en
+el hilo del executor de asgiref: una conexión abierta aquí quedaría ociosa toda la vida
+del worker, sin que close_old_connections la cierre. Antes de un fork (gunicorn
+--preload) se cierran para que los hijos no compartan sockets.
+"""
+import logging
+import os
+import time
+import warnings
+from importlib import import_module
+
+from django.conf import settings
+from django.db import connections
+from django.urls import NoReverseMatch, get_resolver, resolve, reverse
+
+logger = logging.getLogger(__name__)
+
+
+def _serializers() -> None:
+    from rest_framework.settings import api_settings
+    from . import serializers
+
+    for nombre in ("DEFAULT_RENDERER_CLASSES", "DEFAULT_PARSER_CLASSES",
+                   "DEFAULT_AUTHENTICATION_CLASSES", "DEFAULT_PERMISSION_CLASSES",
+                   "EXCEPTION_HANDLER"):
+        getattr(api_settings, nombre)
+
+    for clase in (serializers.CategoriaSerializer, serializers.ProveedorSerializer,
+                  serializers.BodegaSerializer, serializers.ProductoSerializer,
+                  serializers.MovimientoSerializer):
+        clase(many=True).child.fields
+
+
+def _urls() -> None:
+    resolver = get_resolver()
+    resolver.reverse_dict  # importa el URLconf y puebla el resolver
+    router = getattr(import_module(settings.ROOT_URLCONF), "router", None)
+    if router is None:
+        return
+    for _, _, basename in router.registry:
+        for sufijo, kwargs in (("list", {}), ("detail", {"pk": 1})):
+            try:
+                resolve(reverse(f"{basename}-{sufijo}", kwargs=kwargs))
+            except NoReverseMatch:
+                continue
+
+
+def _conexiones() -> None:
+    with warnings.catch_warnings():
+        # Acceso intencional a la BD durante ready(): solo en workers (CALENTAR_ARRANQUE).
+        warnings.filterwarnings("ignore", message="Accessing the database during app initialization")
+        for alias in connections:
+            connections[alias].ensure_connection()
+    os.register_at_fork(before=connections.close_all)
+
+
+def calentar() -> None:
+    inicio = time.perf_counter()
+    pasos = [_serializers, _urls]
+    if getattr(settings, "CALENTAR_CONEXIONES", False):
+        pasos.append(_conexiones)
+    for paso in pasos:
+        try:
+            paso()
+        except Exception:
+            # Un warm-up fallido no debe impedir que el worker arranque.
+            logger.exception("Warm-up: falló %s", paso.__name__)
+    logger.info("Warm-up completo en %.1f ms", (time.perf_counter() - inicio) * 1000)
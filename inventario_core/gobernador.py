@@ -0,0 +1,187 @@
+"""
+Gobernador de consultas para los endpoints sin cota (/productos/, /movimientos/, histórico).
+
+- Paginación obligatoria con tamaño máximo (limit/offset).
+- Largo mínimo y cantidad máxima de términos en ?search= (LIKE sobre varios JOIN).
+- Timeout por consulta en lecturas: MAX_EXECUTION_TIME (MySQL), max_statement_time
+  (MariaDB) o progress handler (SQLite). Una consulta cortada responde 503.
+- Límite por rol con token bucket en la caché local (LocMemCache por defecto): 429 + Retry-After.
+
+Configuración en settings.GOBERNADOR (ver _DEFECTO).
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import OperationalError, connections, router
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+
+from .permissions import _roles
+
+_DEFECTO = {
+    "PAGINA_DEFECTO": 100,
+    "PAGINA_MAXIMA": 500,
+    "BUSQUEDA_MIN_CARACTERES": 3,
+    "BUSQUEDA_MAX_TERMINOS": 5,
+    "TIMEOUT_CONSULTA_MS": 2000,
+    "CACHE": "default",
+    # rol → (capacidad del balde, tokens recargados por segundo)
+    "TASAS_POR_ROL": {
+        "Administrador": (300, 20),
+        "Vendedor": (120, 5),
+        "Consultor": (60, 2),
+        "otros": (30, 1),
+    },
+    # Tokens extra que consume un request con ?search=
+    "COSTO_BUSQUEDA": 4,
+}
+
+
+def config(clave):
+    return getattr(settings, "GOBERNADOR", {}).get(clave, _DEFECTO[clave])
+
+
+# ───────────────────────────────────────────────────────────────────
+# Paginación y búsqueda
+# ───────────────────────────────────────────────────────────────────
+class PaginacionAcotada(LimitOffsetPagination):
+    """?limit= / ?offset=; sin limit se usa PAGINA_DEFECTO y nunca más de PAGINA_MAXIMA."""
+    @property
+    def default_limit(self):
+        return config("PAGINA_DEFECTO")
+
+    @property
+    def max_limit(self):
+        return config("PAGINA_MAXIMA")
+
+
+class BusquedaAcotada(filters.SearchFilter):
+    def get_search_terms(self, request):
+        terminos = super().get_search_terms(request)
+        minimo, maximo = config("BUSQUEDA_MIN_CARACTERES"), config("BUSQUEDA_MAX_TERMINOS")
+        if any(len(t) < minimo for t in terminos):
+            raise ValidationError({self.search_param: f"Cada término debe tener al menos {minimo} caracteres."})
+        if len(terminos) > maximo:
+            raise ValidationError({self.search_param: f"Máximo {maximo} términos de búsqueda."})
+        return terminos
+
+
+# ───────────────────────────────────────────────────────────────────
+# Timeout por consulta
+# ───────────────────────────────────────────────────────────────────
+def activar_timeout(alias: str, ms: int) -> None:
+    conexion = connections[alias]
+    conexion.ensure_connection()
+    if conexion.vendor == "sqlite":
+        limite = time.monotonic() + ms / 1000
+        # SQLite llama al handler cada N instrucciones de la VM; != 0 interrumpe la consulta.
+        conexion.connection.set_progress_handler(lambda: time.monotonic() > limite, 10_000)
+    elif conexion.vendor == "mysql":
+        with conexion.cursor() as cursor:
+            if conexion.mysql_is_mariadb:
+                cursor.execute("SET SESSION max_statement_time = %s", [ms / 1000])
+            else:
+                cursor.execute("SET SESSION MAX_EXECUTION_TIME = %s", [ms])
+
+
+def desactivar_timeout(alias: str) -> None:
+    conexion = connections[alias]
+    if conexion.connection is None:
+        return
+    if conexion.vendor == "sqlite":
+        conexion.connection.set_progress_handler(None, 0)
+    elif conexion.vendor == "mysql":
+        with conexion.cursor() as cursor:
+            variable = "max_statement_time" if conexion.mysql_is_mariadb else "MAX_EXECUTION_TIME"
+            cursor.execute(f"SET SESSION {variable} = 0")
+
+
+def consulta_interrumpida(exc) -> bool:
+    """True si la OperationalError viene de un timeout del gobernador."""
+    if not isinstance(exc, OperationalError):
+        return False
+    codigo = exc.args[0] if exc.args else None
+    # 3024: MySQL MAX_EXECUTION_TIME; 1969: MariaDB max_statement_time
+    return codigo in (3024, 1969) or str(exc) == "interrupted"
+
+
+# ───────────────────────────────────────────────────────────────────
+# Límite por rol (token bucket)
+# ───────────────────────────────────────────────────────────────────
+_lock = threading.Lock()
+
+
+def _rol(user) -> str:
+    if user.is_superuser:
+        return "Administrador"
+    roles = _roles(user)
+    for rol in ("Administrador", "Vendedor", "Consultor"):
+        if rol in roles:
+            return rol
+    return "otros"
+
+
+class BaldeRolThrottle(BaseThrottle):
+    """Token bucket por usuario con capacidad y recarga según su rol."""
+    def allow_request(self, request, view):
+        user = request.user
+        if not user or not user.is_authenticated:
+            return True  # IsAuthenticated responde antes
+
+        tasas = config("TASAS_POR_ROL")
+        capacidad, recarga = tasas.get(_rol(user), tasas["otros"])
+        costo = 1 + (config("COSTO_BUSQUEDA") if request.query_params.get("search") else 0)
+        cache = caches[config("CACHE")]
+        clave = f"gobernador:balde:{user.pk}"
+
+        with _lock:
+            ahora = time.time()
+            tokens, ultimo = cache.get(clave, (capacidad, ahora))
+            tokens = min(capacidad, tokens + (ahora - ultimo) * recarga)
+            permitido = tokens >= costo
+            if permitido:
+                tokens -= costo
+            else:
+                self.espera = (costo - tokens) / recarga
+            cache.set(clave, (tokens, ahora), timeout=int(capacidad / recarga) + 1)
+        return permitido
+
+    def wait(self):
+        return getattr(self, "espera", None)
+
+
+# ───────────────────────────────────────────────────────────────────
+# Mixin para ViewSets
+# ───────────────────────────────────────────────────────────────────
+class GobernadorMixin:
+    """
+    Aplica paginación acotada, límite por rol y timeout de consultas en lecturas.
+    timeout_consulta_ms=None usa GOBERNADOR["TIMEOUT_CONSULTA_MS"]; se puede
+    subir por acción con @action(..., timeout_consulta_ms=...).
+    """
+    pagination_class = PaginacionAcotada
+    throttle_classes = [BaldeRolThrottle]
+    timeout_consulta_ms = None
+    _alias_timeout = None
+
+    def initial(self, request, *args, **kwargs):
+        # Auth, permisos y throttling primero: lo caro se rechaza antes de tocar la BD.
+        super().initial(request, *args, **kwargs)
+        ms = self.timeout_consulta_ms or config("TIMEOUT_CONSULTA_MS")
+        if request.method in SAFE_METHODS and ms:
+            self._alias_timeout = router.db_for_read(self.queryset.model)
+            activar_timeout(self._alias_timeout, ms)
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            # Siempre, incluso con excepciones no manejadas: la conexión puede ser persistente.
+            if self._alias_timeout:
+                desactivar_timeout(self._alias_timeout)
+                self._alias_timeout = None
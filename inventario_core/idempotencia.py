@@ -0,0 +1,92 @@
+"""
+Soporte de cabecera Idempotency-Key para POST que modifican stock.
+
+Los handhelds reintentan el POST cuando se corta el Wi-Fi: con la misma clave,
+el reintento devuelve la respuesta guardada y no crea otro Movimiento.
+
+- Caso normal (clave nueva): una lectura por índice (usuario, clave) + un INSERT
+  en la misma transacción que el movimiento.
+- Misma clave con otro body o en otro endpoint → 422. Dos requests simultáneos con la misma clave:
+  el segundo choca con el índice único, se revierte completo y recibe 409.
+- Solo se guardan respuestas 2xx; los errores se pueden reintentar con la misma clave.
+- Las claves vencen a los settings.IDEMPOTENCIA_TTL (purgar con `manage.py purgar_idempotencia`).
+"""
+import hashlib
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import ClaveIdempotencia
+
+CABECERA = "Idempotency-Key"
+
+
+def ttl() -> timedelta:
+    return getattr(settings, "IDEMPOTENCIA_TTL", timedelta(hours=24))
+
+
+def purgar() -> int:
+    """Elimina claves vencidas; devuelve cuántas borró."""
+    borradas, _ = ClaveIdempotencia.objects.filter(creada__lt=timezone.now() - ttl()).delete()
+    return borradas
+
+
+def idempotente(vista):
+    """Decorador para acciones POST de un ViewSet."""
+    @wraps(vista)
+    def envoltura(self, request, *args, **kwargs):
+        clave = request.headers.get(CABECERA)
+        if not clave:
+            return vista(self, request, *args, **kwargs)
+        if len(clave) > 255:
+            return Response({"detail": f"{CABECERA} demasiado larga (máx. 255)."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        huella = hashlib.sha256(request.body).hexdigest()
+        ruta = f"{self.basename}-{self.action}"
+        try:
+            previa = ClaveIdempotencia.objects.get(usuario_id=request.user.pk, clave=clave)
+        except ClaveIdempotencia.DoesNotExist:
+            previa = None
+
+        if previa and previa.creada < timezone.now() - ttl():
+            previa.delete()
+            previa = None
+        if previa:
+            # La clave es única por usuario, no por endpoint: nunca devolver la respuesta de otro.
+            if previa.ruta != ruta:
+                return Response({"detail": f"{CABECERA} ya usada en otro endpoint."},
+                                status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+            if previa.huella != huella:
+                return Response({"detail": f"{CABECERA} ya usada con otro contenido."},
+                                status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+            return Response(previa.respuesta, status=previa.status_code,
+                            headers={"Idempotent-Replayed": "true"})
+
+        with transaction.atomic():
+            response = vista(self, request, *args, **kwargs)
+            if not status.is_success(response.status_code):
+                return response
+            try:
+                with transaction.atomic():
+                    ClaveIdempotencia.objects.create(
+                        usuario_id=request.user.pk,
+                        clave=clave,
+                        ruta=ruta,
+                        huella=huella,
+                        status_code=response.status_code,
+                        respuesta=response.data,
+                    )
+            except IntegrityError:
+                # Otro request con la misma clave ganó la carrera: deshacer este completo.
+                transaction.set_rollback(True)
+                return Response({"detail": f"Solicitud con la misma {CABECERA} en curso; reintente."},
+                                status=status.HTTP_409_CONFLICT)
+        return response
+
+    return envoltura
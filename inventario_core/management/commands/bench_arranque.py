@@ -0,0 +1,83 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario_core.serializers import RolTokenObtainPairSerializer
+
+# Proceso hijo: arranca inventario.wsgi como lo haría un worker nuevo y mide
+# el tiempo hasta la primera respuesta.
+_HIJO = r"""
+import io, json, os, sys, time
+t0 = time.perf_counter()
+from inventario.wsgi import application
+t1 = time.perf_counter()
+
+def pedir():
+    entorno = {
+        "REQUEST_METHOD": "GET", "PATH_INFO": os.environ["BENCH_RUTA"], "QUERY_STRING": "",
+        "SERVER_NAME": os.environ["BENCH_HOST"], "SERVER_PORT": "80", "HTTP_HOST": os.environ["BENCH_HOST"],
+        "HTTP_ACCEPT": "application/json", "wsgi.input": io.BytesIO(), "wsgi.errors": sys.stderr,
+        "wsgi.url_scheme": "http", "wsgi.version": (1, 0), "wsgi.multithread": False,
+        "wsgi.multiprocess": True, "wsgi.run_once": False,
+    }
+    entorno["HTTP_AUTHORIZATION"] = "Bearer " + os.environ["BENCH_TOKEN"]
+    estado = []
+    b"".join(application(entorno, lambda s, h, e=None: estado.append(s)))
+    return estado[0]
+
+estado = pedir()
+t2 = time.perf_counter()
+pedir()
+t3 = time.perf_counter()
+print(json.dumps({"estado": estado, "arranque": t1 - t0, "primera": t2 - t1, "segunda": t3 - t2}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Cold start de un worker WSGI: tiempo de arranque, del primer y del segundo request, "
+        "con y sin warm-up (INVENTARIO_CALENTAR)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeticiones", type=int, default=5)
+        parser.add_argument("--ruta", default="/productos/")
+        parser.add_argument("--host", default="localhost")
+        # Obligatorio: un GET anónimo responde 403 antes de serializers, querysets y BD,
+        # y el tiempo hasta la primera respuesta no sería representativo.
+        parser.add_argument("--usuario", required=True, help="Username con el que se autentica el GET (JWT).")
+
+    def handle(self, *args, **opts):
+        try:
+            usuario = get_user_model().objects.get(username=opts["usuario"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No existe el usuario {opts['usuario']}.")
+        entorno = {
+            **os.environ, "BENCH_RUTA": opts["ruta"], "BENCH_HOST": opts["host"],
+            "BENCH_TOKEN": str(RolTokenObtainPairSerializer.get_token(usuario).access_token),
+        }
+
+        for calentar in ("0", "1"):
+            medidas = [self._hijo({**entorno, "INVENTARIO_CALENTAR": calentar}) for _ in range(opts["repeticiones"])]
+            mediana = {k: statistics.median(m[k] for m in medidas) * 1000 for k in ("arranque", "primera", "segunda")}
+            self.stdout.write(
+                f"warm-up {'sí' if calentar == '1' else 'no'}  [{medidas[0]['estado']}]  "
+                f"arranque {mediana['arranque']:7.1f} ms | 1er request {mediana['primera']:7.1f} ms | "
+                f"2do request {mediana['segunda']:6.1f} ms | "
+                f"hasta 1ra respuesta {mediana['arranque'] + mediana['primera']:7.1f} ms"
+            )
+
+    def _hijo(self, entorno):
+        salida = subprocess.run(
+            [sys.executable, "-c", _HIJO], env=entorno, cwd=settings.BASE_DIR,
+            capture_output=True, text=True,
+        )
+        if salida.returncode != 0:
+            raise CommandError(salida.stderr.strip())
+        return json.loads(salida.stdout.strip().splitlines()[-1])
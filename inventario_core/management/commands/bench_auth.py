@@ -0,0 +1,65 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from inventario_core.authentication import TokenRolAuthentication, UsuarioToken
+from inventario_core.serializers import RolTokenObtainPairSerializer
+from inventario_core.views import ProductoViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara consultas y latencia de un GET /productos/ autenticado con "
+        "JWTAuthentication (lee User + grupos) vs TokenRolAuthentication (claims)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeticiones", type=int, default=500)
+
+    def handle(self, *args, **opts):
+        factory = APIRequestFactory()
+        with transaction.atomic():
+            usuario = get_user_model().objects.create_user(username="__bench_auth__")
+            usuario.groups.add(Group.objects.get_or_create(name="Consultor")[0])
+            token = RolTokenObtainPairSerializer.get_token(usuario).access_token
+            cabecera = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+
+            def sin_auth():
+                request = factory.get("/productos/")
+                force_authenticate(request, user=UsuarioToken(token), token=token)
+                return request
+
+            casos = [
+                ("sin autenticación (base)", [], sin_auth),
+                ("JWTAuthentication", [JWTAuthentication], lambda: factory.get("/productos/", **cabecera)),
+                ("TokenRolAuthentication", [TokenRolAuthentication], lambda: factory.get("/productos/", **cabecera)),
+            ]
+            base = None
+            for nombre, clases, nuevo_request in casos:
+                # Sin throttling: se mide solo el costo de autenticar
+                vista = ProductoViewSet.as_view(
+                    {"get": "list"}, authentication_classes=clases, throttle_classes=[]
+                )
+                vista(nuevo_request())  # calentar cachés (incluida la de revocaciones)
+
+                with CaptureQueriesContext(connection) as ctx:
+                    respuesta = vista(nuevo_request())
+                consultas = len(ctx.captured_queries)
+                base = consultas if base is None else base
+
+                inicio = time.perf_counter()
+                for _ in range(opts["repeticiones"]):
+                    vista(nuevo_request())
+                ms = (time.perf_counter() - inicio) * 1000 / opts["repeticiones"]
+
+                self.stdout.write(
+                    f"{nombre:<28} HTTP {respuesta.status_code}  {consultas} consultas "
+                    f"({consultas - base} de auth)  {ms:.3f} ms/request"
+                )
+            transaction.set_rollback(True)
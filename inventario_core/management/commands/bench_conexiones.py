@@ -0,0 +1,105 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections, transaction
+
+from inventario_core.models import Bodega, Categoria, Movimiento, Producto, Proveedor, ValorizacionGrupo
+from inventario_core.views import _aplicar_delta_stock
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de escrituras concurrentes (movimiento + delta de stock) "
+        "con conexión nueva por operación vs conexión persistente. "
+        "Comparar el perfil por defecto con SQLITE_TUNING=False / DB_CONN_MAX_AGE=0."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--escritores", type=int, default=8)
+        parser.add_argument("--lectores", type=int, default=4)
+        parser.add_argument("--operaciones", type=int, default=200, help="Por hilo.")
+
+    def handle(self, *args, **opts):
+        db = connection.settings_dict
+        self.stdout.write(
+            f"{db['ENGINE']} | CONN_MAX_AGE={db['CONN_MAX_AGE']} | OPTIONS={db.get('OPTIONS', {})}"
+        )
+
+        producto, bodega = self._preparar()
+        try:
+            for nueva in (True, False):
+                etiqueta = "conexión nueva por operación" if nueva else "conexión persistente"
+                ops, errores, segundos = self._correr(producto.pk, bodega.pk, nueva, opts)
+                self.stdout.write(
+                    f"{etiqueta:<30} {ops / segundos:8.1f} ops/s  "
+                    f"{errores:4d} 'database is locked'  ({segundos:.2f}s)"
+                )
+        finally:
+            # delete() por instancia: la señal descuenta de la valorización lo que sumaron los saves.
+            Producto.objects.filter(pk=producto.pk).delete()
+            bodega.delete()
+            # Grupos de __bench__ que quedaron en cero.
+            for dimension, grupo_id in ((ValorizacionGrupo.CATEGORIA, producto.categoria_id),
+                                        (ValorizacionGrupo.PROVEEDOR, producto.proveedor_id)):
+                ValorizacionGrupo.objects.filter(
+                    dimension=dimension, grupo_id=grupo_id, valor=0, unidades=0
+                ).delete()
+            Categoria.objects.filter(pk=producto.categoria_id).delete()
+            Proveedor.objects.filter(pk=producto.proveedor_id).delete()
+
+    def _preparar(self):
+        categoria, _ = Categoria.objects.get_or_create(nombre="__bench__")
+        proveedor = Proveedor.objects.create(
+            razon_social="__bench__", rut="0-0", email="bench@example.com", telefono="0"
+        )
+        producto = Producto.objects.create(
+            sku="__bench__", nombre="bench", categoria=categoria, proveedor=proveedor, precio=1
+        )
+        bodega = Bodega.objects.create(nombre="__bench__", ubicacion="__bench__")
+        return producto, bodega
+
+    def _correr(self, producto_id, bodega_id, nueva, opts):
+        contador = {"ops": 0, "errores": 0}
+        lock = threading.Lock()
+
+        def escritor():
+            for _ in range(opts["operaciones"]):
+                try:
+                    # Mismo camino que POST /movimientos/: fila bloqueada, save() y valorización.
+                    with transaction.atomic():
+                        movimiento = Movimiento.objects.create(
+                            producto_id=producto_id, bodega_id=bodega_id,
+                            tipo=Movimiento.ENTRADA, cantidad=1,
+                        )
+                        _aplicar_delta_stock(movimiento.producto, movimiento.tipo, movimiento.cantidad)
+                    with lock:
+                        contador["ops"] += 1
+                except OperationalError:
+                    with lock:
+                        contador["errores"] += 1
+                if nueva:
+                    connection.close()
+            connections.close_all()
+
+        def lector():
+            for _ in range(opts["operaciones"]):
+                try:
+                    Producto.objects.filter(pk=producto_id).values_list("stock_actual", flat=True).first()
+                    with lock:
+                        contador["ops"] += 1
+                except OperationalError:
+                    with lock:
+                        contador["errores"] += 1
+                if nueva:
+                    connection.close()
+            connections.close_all()
+
+        hilos = [threading.Thread(target=escritor) for _ in range(opts["escritores"])]
+        hilos += [threading.Thread(target=lector) for _ in range(opts["lectores"])]
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        return contador["ops"], contador["errores"], time.perf_counter() - inicio
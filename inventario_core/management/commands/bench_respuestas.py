@@ -0,0 +1,80 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from inventario_core.models import Bodega, Categoria, Movimiento, Producto, Proveedor
+
+
+class Command(BaseCommand):
+    help = (
+        "Bytes y ms por request de /productos/ y /productos/<id>/historico/ con y sin "
+        "?fields=, gzip/brotli y MessagePack. Los datos de prueba se crean y se revierten."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--productos", type=int, default=2000)
+        parser.add_argument("--movimientos", type=int, default=2000)
+        parser.add_argument("--repeticiones", type=int, default=20)
+
+    def handle(self, *args, **opts):
+        setup_test_environment()
+        try:
+            with transaction.atomic():
+                producto_id = self._datos(opts["productos"], opts["movimientos"])
+                cliente = Client()
+                cliente.force_login(get_user_model().objects.create_superuser("__bench_resp__"))
+
+                listado, historico = "/productos/", f"/productos/{producto_id}/historico/"
+                casos = [
+                    ("listado completo", listado, {}),
+                    ("listado ?fields=id,sku,stock_actual", listado + "?fields=id,sku,stock_actual", {}),
+                    ("listado gzip", listado, {"HTTP_ACCEPT_ENCODING": "gzip"}),
+                    ("listado brotli", listado, {"HTTP_ACCEPT_ENCODING": "br"}),
+                    ("listado msgpack", listado, {"HTTP_ACCEPT": "application/msgpack"}),
+                    ("listado fields + brotli", listado + "?fields=id,sku,stock_actual",
+                     {"HTTP_ACCEPT_ENCODING": "br"}),
+                    ("histórico completo", historico, {}),
+                    ("histórico ?fields=fecha,tipo,cantidad", historico + "?fields=fecha,tipo,cantidad", {}),
+                    ("histórico fields + gzip", historico + "?fields=fecha,tipo,cantidad",
+                     {"HTTP_ACCEPT_ENCODING": "gzip"}),
+                ]
+                for nombre, url, cabeceras in casos:
+                    self._medir(cliente, nombre, url, cabeceras, opts["repeticiones"])
+                transaction.set_rollback(True)
+        finally:
+            teardown_test_environment()
+
+    def _medir(self, cliente, nombre, url, cabeceras, repeticiones):
+        cabeceras = {"HTTP_ACCEPT": "application/json", **cabeceras}
+        respuesta = cliente.get(url, **cabeceras)
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            cliente.get(url, **cabeceras)
+        ms = (time.perf_counter() - inicio) * 1000 / repeticiones
+        encoding = respuesta.get("Content-Encoding", "-")
+        self.stdout.write(
+            f"{nombre:<40} HTTP {respuesta.status_code}  {len(respuesta.content):>9} bytes  "
+            f"{encoding:<5} {ms:8.2f} ms/request"
+        )
+
+    def _datos(self, n_productos, n_movimientos):
+        categoria = Categoria.objects.create(nombre="__bench_resp__")
+        proveedor = Proveedor.objects.create(
+            razon_social="__bench_resp__", rut="0-0", email="bench@example.com", telefono="0"
+        )
+        bodega = Bodega.objects.create(nombre="__bench_resp__", ubicacion="__bench_resp__")
+        productos = Producto.objects.bulk_create([
+            Producto(sku=f"__bench_{i}", nombre=f"Producto {i}", categoria=categoria,
+                     proveedor=proveedor, precio=1000, stock_actual=i)
+            for i in range(n_productos)
+        ])
+        Movimiento.objects.bulk_create([
+            Movimiento(producto=productos[0], bodega=bodega, tipo=Movimiento.ENTRADA,
+                       cantidad=1, observacion="bench")
+            for _ in range(n_movimientos)
+        ])
+        return productos[0].pk
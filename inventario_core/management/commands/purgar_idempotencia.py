@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from inventario_core.idempotencia import purgar
+
+
+class Command(BaseCommand):
+    help = "Elimina las Idempotency-Key vencidas (más antiguas que IDEMPOTENCIA_TTL)."
+
+    def handle(self, *args, **opts):
+        self.stdout.write(self.style.SUCCESS(f"Claves eliminadas: {purgar()}"))
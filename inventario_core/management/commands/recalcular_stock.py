@@ -0,0 +1,56 @@
+from functools import partial
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario_core import reposicion, valorizacion
+from inventario_core.trabajos import ejecutar_trabajo, particionar, recalcular_stock
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconcilia stock_actual contra el histórico de movimientos en paralelo. "
+        "Por defecto solo informa; usar --aplicar para corregir. "
+        "Los productos con más salidas que entradas registradas (stock cargado sin ENTRADA) "
+        "se listan aparte y no se corrigen."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=None, help="Procesos (por defecto: núcleos).")
+        parser.add_argument("--tamano", type=int, default=5000, help="Ids de producto por partición.")
+        parser.add_argument("--aplicar", action="store_true", help="Corrige los productos descuadrados.")
+        parser.add_argument("--reiniciar", action="store_true", help="Ignora checkpoints previos.")
+
+    def handle(self, *args, **opts):
+        if opts["tamano"] <= 0:
+            raise CommandError("--tamano debe ser > 0.")
+
+        nombre = "recalcular_stock:aplicar" if opts["aplicar"] else "recalcular_stock"
+        resultado, fallidas = ejecutar_trabajo(
+            nombre,
+            partial(recalcular_stock, aplicar=opts["aplicar"]),
+            particionar(opts["tamano"]),
+            workers=opts["workers"],
+            reanudar=not opts["reiniciar"],
+        )
+
+        self.stdout.write(
+            f"Revisados: {resultado.get('revisados', 0)} | "
+            f"descuadrados: {resultado.get('descuadrados', 0)} | "
+            f"corregidos: {resultado.get('corregidos', 0)}"
+        )
+        sin_base = sorted(resultado.get("sin_base", []))
+        if sin_base:
+            muestra = ", ".join(map(str, sin_base[:20])) + (" …" if len(sin_base) > 20 else "")
+            self.stdout.write(self.style.WARNING(
+                f"Sin base ({len(sin_base)}): neto de movimientos negativo, revisar a mano: {muestra}"
+            ))
+        if resultado.get("corregidos"):
+            # bulk_update no dispara señales: re-agregar la valorización y
+            # descartar las sugerencias de reposición calculadas con el stock anterior.
+            valorizacion.reconstruir()
+            reposicion.invalidar()
+        if fallidas:
+            raise CommandError(
+                f"{len(fallidas)} particiones fallaron; vuelve a ejecutar para reanudar."
+            )
+        self.stdout.write(self.style.SUCCESS("Listo."))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario_core import valorizacion
+
+
+class Command(BaseCommand):
+    help = "Compara los totales de valorización con el agregado completo sobre Producto."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reparar", action="store_true", help="Reconstruye los totales si difieren.")
+
+    def handle(self, *args, **opts):
+        diferencias = valorizacion.verificar()
+        if not diferencias:
+            self.stdout.write(self.style.SUCCESS("Valorización consistente."))
+            return
+
+        for d in diferencias:
+            self.stdout.write(
+                f"{d['dimension']} {d['grupo_id']}: guardado {d['guardado']} ({d['unidades_guardadas']} u) "
+                f"≠ esperado {d['esperado']} ({d['unidades_esperadas']} u)"
+            )
+        if not opts["reparar"]:
+            raise CommandError(f"{len(diferencias)} grupos con diferencias (usar --reparar).")
+
+        valorizacion.reconstruir()
+        self.stdout.write(self.style.SUCCESS("Totales reconstruidos."))
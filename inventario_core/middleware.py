@@ -0,0 +1,53 @@
+import re
+
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # dependencia opcional: sin ella solo gzip
+    brotli = None
+
+_ACEPTA_BR = re.compile(r"\bbr\b")
+
+# Solo respuestas de la API: el HTML (admin, login, API navegable) lleva tokens CSRF
+# y debe pasar por gzip, que agrega el relleno aleatorio contra BREACH.
+_TIPOS_BROTLI = {"application/json", "application/msgpack"}
+
+
+def _es_api(response) -> bool:
+    tipo = response.get("Content-Type", "").split(";")[0].strip().lower()
+    return tipo in _TIPOS_BROTLI or tipo.endswith("+json")
+
+
+class CompresionMiddleware(GZipMiddleware):
+    """
+    Comprime respuestas según Accept-Encoding:
+    - brotli ("br") para JSON / MessagePack si el cliente lo acepta y el paquete está instalado,
+    - si no, gzip (comportamiento de GZipMiddleware, con su mitigación de BREACH).
+    """
+    def process_response(self, request, response):
+        if (
+            brotli is None
+            or not _ACEPTA_BR.search(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+            or response.streaming
+            or not _es_api(response)
+            or response.has_header("Content-Encoding")
+            or len(response.content) < 200
+        ):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        comprimido = brotli.compress(response.content, quality=getattr(settings, "BROTLI_CALIDAD", 5))
+        if len(comprimido) >= len(response.content):
+            return response
+
+        response.content = comprimido
+        response.headers["Content-Length"] = str(len(comprimido))
+        # Igual que gzip: el ETag fuerte deja de corresponder al cuerpo comprimido.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+        return response
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario_core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AvanceTrabajo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trabajo', models.CharField(max_length=100)),
+                ('desde', models.BigIntegerField()),
+                ('hasta', models.BigIntegerField()),
+                ('resultado', models.JSONField(default=dict)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['trabajo', 'desde'],
+                'unique_together': {('trabajo', 'desde', 'hasta')},
+            },
+        ),
+    ]
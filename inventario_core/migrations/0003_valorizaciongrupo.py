@@ -0,0 +1,49 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:30
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def poblar_valorizacion(apps, schema_editor):
+    """Totales iniciales desde los productos existentes."""
+    Producto = apps.get_model('inventario_core', 'Producto')
+    ValorizacionGrupo = apps.get_model('inventario_core', 'ValorizacionGrupo')
+
+    totales = {}
+    for categoria_id, proveedor_id, precio, stock in Producto.objects.values_list(
+        'categoria_id', 'proveedor_id', 'precio', 'stock_actual'
+    ).iterator():
+        for clave in (('CATEGORIA', categoria_id), ('PROVEEDOR', proveedor_id)):
+            valor, unidades = totales.get(clave, (Decimal(0), 0))
+            totales[clave] = (valor + precio * stock, unidades + stock)
+
+    ValorizacionGrupo.objects.bulk_create([
+        ValorizacionGrupo(dimension=d, grupo_id=g, valor=v, unidades=u)
+        for (d, g), (v, u) in totales.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario_core', '0002_avancetrabajo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ValorizacionGrupo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('CATEGORIA', 'Categoría'), ('PROVEEDOR', 'Proveedor')], max_length=10)),
+                ('grupo_id', models.BigIntegerField()),
+                ('valor', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('unidades', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['dimension', 'grupo_id'],
+                'unique_together': {('dimension', 'grupo_id')},
+            },
+        ),
+        migrations.RunPython(poblar_valorizacion, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-19 13:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario_core', '0004_claveidempotencia'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TokenRevocado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sid', models.CharField(blank=True, default='', max_length=64)),
+                ('usuario_id', models.CharField(blank=True, default='', max_length=64)),
+                ('creado', models.DateTimeField(default=django.utils.timezone.now)),
+                ('expira', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
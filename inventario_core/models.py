@@ -1,3 +1,5 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models, transaction
 from django.core.exceptions import ValidationError
 from django.utils import timezone
@@ -53,6 +55,27 @@ class Producto(models.Model):
     def __str__(self):
         return f"{self.sku} - {self.nombre}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Estado al cargar: valorizacion.py calcula deltas sin volver a leer la fila.
+        instance._valorizacion = instance.estado_valorizacion()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._valorizacion = self.estado_valorizacion()
+
+    def estado_valorizacion(self):
+        """
+        (categoria_id, proveedor_id, precio, stock_actual) tal como está en memoria,
+        o None si algún campo quedó diferido (only/defer) y habría que ir a la BD.
+        """
+        try:
+            return tuple(self.__dict__[c] for c in ("categoria_id", "proveedor_id", "precio", "stock_actual"))
+        except KeyError:
+            return None
+
 
 class Movimiento(models.Model):
     ENTRADA, SALIDA, MERMA = "ENTRADA", "SALIDA", "MERMA"
@@ -74,3 +97,79 @@ class Movimiento(models.Model):
     def clean(self):
         if self.cantidad == 0:
             raise ValidationError("La cantidad debe ser mayor a cero.")
+
+
+class ValorizacionGrupo(models.Model):
+    """
+    Totales corrientes de inventario (precio × stock_actual) por categoría y proveedor.
+    Se mantienen por deltas desde las señales de Producto (ver valorizacion.py).
+    """
+    CATEGORIA, PROVEEDOR = "CATEGORIA", "PROVEEDOR"
+    DIMENSIONES = [(CATEGORIA, "Categoría"), (PROVEEDOR, "Proveedor")]
+
+    dimension = models.CharField(max_length=10, choices=DIMENSIONES)
+    grupo_id = models.BigIntegerField()
+    valor = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    unidades = models.BigIntegerField(default=0)
+
+    class Meta:
+        ordering = ["dimension", "grupo_id"]
+        unique_together = [("dimension", "grupo_id")]
+
+    def __str__(self):
+        return f"{self.dimension} {self.grupo_id}: {self.valor}"
+
+
+class ClaveIdempotencia(models.Model):
+    """
+    Respuesta guardada de un POST con cabecera Idempotency-Key (ver idempotencia.py).
+    Un reintento con la misma clave devuelve esta respuesta sin volver a tocar el stock.
+    """
+    usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+    clave = models.CharField(max_length=255)
+    ruta = models.CharField(max_length=100)
+    huella = models.CharField(max_length=64)  # sha256 del body
+    status_code = models.PositiveSmallIntegerField()
+    respuesta = models.JSONField(encoder=DjangoJSONEncoder)
+    creada = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        unique_together = [("usuario", "clave")]
+
+    def __str__(self):
+        return f"{self.clave} ({self.ruta})"
+
+
+class TokenRevocado(models.Model):
+    """
+    Revocaciones de JWT (ver authentication.py):
+    - sid: una sesión (logout); invalida el refresh y todos los access derivados.
+    - usuario_id: todos los tokens del usuario emitidos antes de `creado` (usuario deshabilitado).
+    `expira` marca cuándo ya no queda ningún token vivo al que aplique.
+    """
+    sid = models.CharField(max_length=64, blank=True, default="")
+    usuario_id = models.CharField(max_length=64, blank=True, default="")
+    creado = models.DateTimeField(default=timezone.now)
+    expira = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"sid={self.sid}" if self.sid else f"usuario={self.usuario_id}"
+
+
+class AvanceTrabajo(models.Model):
+    """
+    Checkpoint de trabajos por lotes (ver trabajos.py).
+    Cada fila es una partición [desde, hasta) de ids de Producto ya procesada.
+    """
+    trabajo = models.CharField(max_length=100)
+    desde = models.BigIntegerField()
+    hasta = models.BigIntegerField()
+    resultado = models.JSONField(default=dict)
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["trabajo", "desde"]
+        unique_together = [("trabajo", "desde", "hasta")]
+
+    def __str__(self):
+        return f"{self.trabajo} [{self.desde}, {self.hasta})"
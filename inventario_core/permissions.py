@@ -3,9 +3,24 @@ from rest_framework.permissions import BasePermission, SAFE_METHODS
 # ────────────────────────────────
 # Utilidad base
 # ────────────────────────────────
+def _roles(user) -> frozenset:
+    """
+    Nombres de grupo del usuario.
+    - UsuarioToken (JWT con claims): vienen en el token, sin consultar la BD.
+    - User normal: una sola consulta por request, cacheada en el objeto.
+    """
+    roles = getattr(user, "roles", None)
+    if roles is None:
+        roles = getattr(user, "_roles_cache", None)
+        if roles is None:
+            roles = frozenset(user.groups.values_list("name", flat=True))
+            user._roles_cache = roles
+    return roles
+
+
 def _in_group(user, group_name: str) -> bool:
     """Devuelve True si el usuario pertenece al grupo indicado."""
-    return user and user.is_authenticated and user.groups.filter(name=group_name).exists()
+    return bool(user and user.is_authenticated and group_name in _roles(user))
 
 
 # ────────────────────────────────
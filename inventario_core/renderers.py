@@ -0,0 +1,33 @@
+"""
+Renderer MessagePack opcional (pip install msgpack).
+
+Se elige con `Accept: application/msgpack` o `?format=msgpack`; settings.py lo
+registra solo si el paquete está instalado.
+"""
+import datetime
+
+from rest_framework.renderers import BaseRenderer
+
+try:
+    import msgpack
+except ImportError:  # dependencia opcional
+    msgpack = None
+
+
+def _a_primitivo(obj):
+    # Como JSONRenderer: fechas en ISO 8601; Decimal, UUID y lazy strings como texto.
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    return str(obj)
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=_a_primitivo, use_bin_type=True)
@@ -0,0 +1,128 @@
+"""
+Sugerencias de reposición a partir del histórico de SALIDA / MERMA.
+
+- Una sola consulta agrupada (producto, día) → matriz productos × días en NumPy.
+- Por producto: media diaria, media móvil de la última ventana, desviación,
+  días de cobertura del stock_actual, punto de reorden y cantidad sugerida.
+- Resultado agrupado por proveedor, ordenado por menor cobertura.
+- Se cachea hasta el próximo movimiento (invalidar() sube la versión de la caché).
+  Con varios workers la caché debe ser compartida (Redis/Memcached); con LocMemCache
+  cada proceso invalida solo la suya y el resto espera a REPOSICION_CACHE_TTL.
+
+NumPy se importa dentro de calcular() para no exigirlo al resto de la API.
+"""
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Movimiento, Producto
+
+_VERSION = "reposicion:version"
+
+
+def invalidar() -> None:
+    """Descarta las sugerencias cacheadas (llamar al registrar movimientos)."""
+    try:
+        cache.incr(_VERSION)
+    except ValueError:
+        cache.set(_VERSION, 1, timeout=None)
+
+
+def sugerencias(dias=60, ventana=7, plazo=7, objetivo=14, z=1.65) -> list[dict]:
+    cache.add(_VERSION, 0, timeout=None)
+    clave = f"reposicion:{cache.get(_VERSION, 0)}:{dias}:{ventana}:{plazo}:{objetivo}:{z}"
+    resultado = cache.get(clave)
+    if resultado is None:
+        resultado = calcular(dias, ventana, plazo, objetivo, z)
+        cache.set(clave, resultado, timeout=getattr(settings, "REPOSICION_CACHE_TTL", 900))
+    return resultado
+
+
+def calcular(dias, ventana, plazo, objetivo, z) -> list[dict]:
+    """
+    dias:     largo del histórico analizado.
+    ventana:  días de la media móvil reciente.
+    plazo:    lead time del proveedor (días).
+    objetivo: días de cobertura a comprar por sobre el plazo.
+    z:        factor de servicio para el stock de seguridad (1.65 ≈ 95%).
+    """
+    import numpy as np
+
+    desde = timezone.localdate() - timedelta(days=dias - 1)
+    filas = list(
+        Movimiento.objects
+        .filter(
+            tipo__in=[Movimiento.SALIDA, Movimiento.MERMA],
+            fecha__gte=timezone.make_aware(datetime.combine(desde, time.min)),
+        )
+        .annotate(dia=TruncDate("fecha"))
+        .order_by()
+        .values("producto_id", "dia")
+        .annotate(total=Sum("cantidad"))
+        .values_list("producto_id", "dia", "total")
+    )
+    if not filas:
+        return []
+
+    # ── Matriz de demanda diaria ────────────────────────────────────
+    pids, dias_mov, totales = zip(*filas)
+    pid = np.fromiter(pids, dtype=np.int64, count=len(filas))
+    col = (np.array(dias_mov, dtype="datetime64[D]") - np.datetime64(desde, "D")).astype(np.int64)
+    total = np.fromiter(totales, dtype=np.float32, count=len(filas))
+    validos = (col >= 0) & (col < dias)
+
+    ids, fila = np.unique(pid[validos], return_inverse=True)
+    demanda = np.zeros((len(ids), dias), dtype=np.float32)
+    demanda[fila, col[validos]] = total[validos]
+
+    # ── Datos de producto alineados con `ids` ───────────────────────
+    productos = list(
+        Producto.objects.order_by("id")
+        .values_list("id", "sku", "nombre", "stock_actual", "proveedor_id", "proveedor__razon_social")
+    )
+    if not productos:
+        return []
+    prod_ids = np.fromiter((p[0] for p in productos), dtype=np.int64, count=len(productos))
+    stock_todos = np.fromiter((p[3] for p in productos), dtype=np.float32, count=len(productos))
+    pos = np.searchsorted(prod_ids, ids).clip(max=len(prod_ids) - 1)
+    existe = prod_ids[pos] == ids
+    stock = stock_todos[pos]
+
+    # ── Indicadores ─────────────────────────────────────────────────
+    media = demanda.mean(axis=1)
+    movil = demanda[:, -ventana:].mean(axis=1)
+    desviacion = demanda.std(axis=1)
+    tasa = np.maximum(media, movil)  # conservador: si la demanda sube, manda la reciente
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cobertura = np.where(tasa > 0, stock / tasa, np.inf)
+    seguridad = z * desviacion * np.sqrt(plazo)
+    punto_reorden = tasa * plazo + seguridad
+    sugerida = np.ceil(np.maximum(tasa * (plazo + objetivo) + seguridad - stock, 0))
+
+    reponer = np.flatnonzero(existe & (stock <= punto_reorden) & (sugerida > 0))
+    reponer = reponer[np.argsort(cobertura[reponer], kind="stable")]
+
+    # ── Agrupar por proveedor (en orden de urgencia) ────────────────
+    grupos = {}
+    for i in reponer.tolist():
+        _, sku, nombre, stock_actual, proveedor_id, proveedor = productos[pos[i]]
+        grupo = grupos.setdefault(proveedor_id, {
+            "proveedor_id": proveedor_id, "proveedor": proveedor, "productos": [],
+        })
+        grupo["productos"].append({
+            "id": int(ids[i]),
+            "sku": sku,
+            "nombre": nombre,
+            "stock_actual": stock_actual,
+            "demanda_diaria": round(float(media[i]), 2),
+            "media_movil": round(float(movil[i]), 2),
+            "desviacion": round(float(desviacion[i]), 2),
+            "dias_cobertura": round(float(cobertura[i]), 1),
+            "punto_reorden": round(float(punto_reorden[i]), 1),
+            "cantidad_sugerida": int(sugerida[i]),
+        })
+    return list(grupos.values())
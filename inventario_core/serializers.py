@@ -1,29 +1,67 @@
+import time
+import uuid
+
 from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from .authentication import revocado
 from .models import Categoria, Proveedor, Bodega, Producto, Movimiento
 
 
+# ---------- Campos dinámicos (?fields= / ?omit=) ----------
+def campos_solicitados(request, disponibles):
+    """
+    Campos a devolver según ?fields=a,b / ?omit=c (solo en GET/HEAD).
+    None = todos. Campos desconocidos → ValidationError (400).
+    """
+    if request is None or request.method not in ("GET", "HEAD"):
+        return None
+    fields = request.query_params.get("fields")
+    omit = request.query_params.get("omit")
+    if not fields and not omit:
+        return None
+
+    pedidos = [c.strip() for c in (fields or omit).split(",") if c.strip()]
+    desconocidos = [c for c in pedidos if c not in disponibles]
+    if desconocidos:
+        raise serializers.ValidationError({"fields": f"Campos desconocidos: {', '.join(desconocidos)}."})
+    if fields:
+        return [c for c in disponibles if c in pedidos]
+    return [c for c in disponibles if c not in pedidos]
+
+
+class CamposDinamicosMixin:
+    """Recorta los campos del serializer según ?fields= / ?omit= del request en contexto."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        campos = campos_solicitados(self.context.get("request"), list(self.fields))
+        if campos is not None:
+            for nombre in set(self.fields) - set(campos):
+                self.fields.pop(nombre)
+
+
 # ---------- Básicos ----------
-class CategoriaSerializer(serializers.ModelSerializer):
+class CategoriaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     class Meta:
         model = Categoria
         fields = "__all__"
 
 
-class ProveedorSerializer(serializers.ModelSerializer):
+class ProveedorSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     class Meta:
         model = Proveedor
         fields = "__all__"
 
 
-class BodegaSerializer(serializers.ModelSerializer):
+class BodegaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     class Meta:
         model = Bodega
         fields = "__all__"
 
 
 # ---------- Producto ----------
-class ProductoSerializer(serializers.ModelSerializer):
+class ProductoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     categoria_nombre = serializers.CharField(source="categoria.nombre", read_only=True)
     proveedor_nombre = serializers.CharField(source="proveedor.razon_social", read_only=True)
 
@@ -48,7 +86,7 @@ class ProductoSerializer(serializers.ModelSerializer):
 
 
 # ---------- Movimiento ----------
-class MovimientoSerializer(serializers.ModelSerializer):
+class MovimientoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     producto_sku = serializers.CharField(source="producto.sku", read_only=True)
     bodega_nombre = serializers.CharField(source="bodega.nombre", read_only=True)
 
@@ -115,3 +153,30 @@ class MovimientoSerializer(serializers.ModelSerializer):
             return super().update(instance, validated_data)
         except DjangoValidationError as e:
             raise serializers.ValidationError({"detail": e.messages})
+
+
+# ---------- JWT ----------
+class RolTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Agrega al token los claims que usa TokenRolAuthentication para no leer User:
+    roles (grupos), is_superuser, sid (sesión, para logout) y login (epoch).
+    Se copian a cada access token obtenido con el refresh; por eso cambiar grupos
+    o permisos del usuario revoca sus tokens (ver signals.py).
+    """
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token["roles"] = sorted(user.groups.values_list("name", flat=True))
+        token["is_superuser"] = user.is_superuser
+        token["sid"] = uuid.uuid4().hex
+        # Con decimales: un login en el mismo segundo que una revocación sigue siendo válido.
+        token["login"] = time.time()
+        return token
+
+
+class RolTokenRefreshSerializer(TokenRefreshSerializer):
+    """Rechaza refresh tokens revocados (logout, cambio de roles, usuario deshabilitado)."""
+    def validate(self, attrs):
+        if revocado(self.token_class(attrs["refresh"])):
+            raise AuthenticationFailed("El token fue revocado.", code="token_revoked")
+        return super().validate(attrs)
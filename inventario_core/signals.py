@@ -0,0 +1,120 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import valorizacion
+from .authentication import revocar_usuario
+from .models import Producto
+
+
+# ───────────────────────────────────────────────────────────────────
+# Valorización incremental (ver valorizacion.py)
+# ───────────────────────────────────────────────────────────────────
+@receiver(pre_save, sender=Producto)
+def producto_pre_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if instance._state.adding:
+        instance._valorizacion = None
+    elif getattr(instance, "_valorizacion", None) is None:
+        # Instancia sin estado de carga (construida a mano o con campos diferidos).
+        instance._valorizacion = valorizacion.estado_en_bd(instance.pk)
+
+
+@receiver(post_save, sender=Producto)
+def producto_post_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    previo = instance._valorizacion
+    nuevo = valorizacion.estado_guardado(previo, instance, update_fields)
+    valorizacion.aplicar(previo, nuevo)
+    instance._valorizacion = nuevo
+
+
+@receiver(pre_delete, sender=Producto)
+def producto_pre_delete(sender, instance, **kwargs):
+    if getattr(instance, "_valorizacion", None) is None:
+        instance._valorizacion = valorizacion.estado_en_bd(instance.pk)
+
+
+@receiver(post_delete, sender=Producto)
+def producto_post_delete(sender, instance, **kwargs):
+    valorizacion.aplicar(instance._valorizacion, None)
+
+
+# ───────────────────────────────────────────────────────────────────
+# Revocación de JWT al cambiar permisos / deshabilitar / eliminar usuarios
+# (ver authentication.py). Los roles viajan en el token: cualquier cambio que
+# los afecte invalida los tokens emitidos hasta ahora.
+# ───────────────────────────────────────────────────────────────────
+_CAMPOS_PERMISOS = ("is_active", "is_staff", "is_superuser")
+
+
+@receiver(pre_save, sender=settings.AUTH_USER_MODEL)
+def usuario_pre_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._revocar_tokens = False
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and not set(update_fields) & set(_CAMPOS_PERMISOS):
+        return  # p. ej. save(update_fields=["last_login"]) en cada login
+    previo = sender.objects.filter(pk=instance.pk).values(*_CAMPOS_PERMISOS).first()
+    instance._revocar_tokens = previo is not None and (
+        not instance.is_active
+        or any(previo[campo] != getattr(instance, campo) for campo in _CAMPOS_PERMISOS)
+    )
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def usuario_post_save(sender, instance, created=False, raw=False, **kwargs):
+    if getattr(instance, "_revocar_tokens", False):
+        instance._revocar_tokens = False
+        revocar_usuario(instance.pk)
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def usuario_post_delete(sender, instance, **kwargs):
+    revocar_usuario(instance.pk)
+
+
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+def usuario_grupos_cambiados(sender, instance, action, reverse, pk_set, **kwargs):
+    """user.groups.add/remove/clear y group.user_set.add/remove/clear."""
+    if action == "pre_clear" and reverse:
+        # Tras el clear ya no se sabe qué usuarios tenía el grupo.
+        instance._usuarios_previos = list(instance.user_set.values_list("pk", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if action != "post_clear" and not pk_set:
+        return  # add() de grupos que ya tenía: nada cambió
+    if not reverse:
+        revocar_usuario(instance.pk)
+    elif action == "post_clear":
+        for usuario_id in getattr(instance, "_usuarios_previos", ()):
+            revocar_usuario(usuario_id)
+    else:
+        for usuario_id in pk_set or ():
+            revocar_usuario(usuario_id)
+
+
+def _revocar_miembros(grupo) -> None:
+    for usuario_id in grupo.user_set.values_list("pk", flat=True):
+        revocar_usuario(usuario_id)
+
+
+@receiver(pre_save, sender=Group)
+def grupo_pre_save(sender, instance, raw=False, **kwargs):
+    # Los roles del token son nombres de grupo: renombrar un grupo cambia permisos.
+    if raw or instance.pk is None:
+        return
+    nombre = sender.objects.filter(pk=instance.pk).values_list("name", flat=True).first()
+    if nombre is not None and nombre != instance.name:
+        _revocar_miembros(instance)
+
+
+@receiver(pre_delete, sender=Group)
+def grupo_pre_delete(sender, instance, **kwargs):
+    # El borrado en cascada de la tabla intermedia no emite m2m_changed.
+    _revocar_miembros(instance)
@@ -1,3 +1,738 @@
-from django.test import TestCase
+import gzip
+import warnings
+from concurrent.futures import Future
+from datetime import timedelta
+from decimal import Decimal
+from importlib.util import find_spec
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.management import call_command
+from django.db import OperationalError, connection, transaction
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from inventario.db_router import LecturaReplicaMiddleware, ReplicaRouter
+from . import calentamiento, reposicion, trabajos, valorizacion
+from .authentication import _revocaciones
+from .gobernador import activar_timeout, consulta_interrumpida, desactivar_timeout
+from .idempotencia import CABECERA
+from .models import (
+    AvanceTrabajo, Bodega, Categoria, ClaveIdempotencia, Movimiento, Producto, Proveedor, TokenRevocado,
+)
+from .views import ProductoViewSet, _aplicar_delta_stock
+
+
+def _usuario(username, *roles):
+    usuario = User.objects.create_user(username=username, password="clave-segura-123")
+    for rol in roles:
+        usuario.groups.add(Group.objects.get_or_create(name=rol)[0])
+    return usuario
+
+
+class BaseAPITest(APITestCase):
+    """Catálogo mínimo y un usuario por rol; autentica como Administrador."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.categoria = Categoria.objects.create(nombre="Bebidas")
+        cls.otra_categoria = Categoria.objects.create(nombre="Snacks")
+        cls.proveedor = Proveedor.objects.create(
+            razon_social="Distribuidora Sur", rut="76.123.456-7", email="ventas@sur.cl", telefono="221234567"
+        )
+        cls.bodega = Bodega.objects.create(nombre="Central", ubicacion="Santiago")
+        cls.admin = _usuario("admin", "Administrador")
+        cls.vendedor = _usuario("vendedor", "Vendedor")
+        cls.consultor = _usuario("consultor", "Consultor")
+
+    def setUp(self):
+        cache.clear()  # baldes del gobernador, sugerencias, etc.
+        self.client.force_authenticate(self.admin)
+
+    def crear_producto(self, sku="SKU-001", precio="1000.00", stock=10, **extra):
+        return Producto.objects.create(
+            sku=sku, nombre=f"Producto {sku}", categoria=extra.pop("categoria", self.categoria),
+            proveedor=extra.pop("proveedor", self.proveedor), precio=Decimal(precio), stock_actual=stock, **extra
+        )
+
+    def mover(self, producto, tipo, cantidad, **cabeceras):
+        return self.client.post("/movimientos/", {
+            "producto": producto.pk, "bodega": self.bodega.pk, "tipo": tipo, "cantidad": cantidad,
+        }, format="json", **cabeceras)
+
+
+# ───────────────────────────────────────────────────────────────────
+# Trabajos por lotes con checkpoints
+# ───────────────────────────────────────────────────────────────────
+class _EjecutorEnLinea:
+    """
+    Reemplaza al ProcessPoolExecutor: cada partición corre en este proceso y con la
+    conexión del test (la BD de test vive en su transacción; un hijo no la vería).
+    """
+    def __init__(self, max_workers=None, initializer=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, tarea, *args):
+        futuro = Future()
+        try:
+            futuro.set_result(tarea(*args))
+        except Exception as e:
+            futuro.set_exception(e)
+        return futuro
+
+
+@mock.patch.object(trabajos, "connections", mock.MagicMock())
+@mock.patch.object(trabajos, "ProcessPoolExecutor", _EjecutorEnLinea)
+class TrabajosTests(BaseAPITest):
+    PARTICIONES = [(1, 11), (11, 21), (21, 31)]
+
+    def setUp(self):
+        super().setUp()
+        self.llamadas = []
+
+    def contar(self, desde, hasta):
+        self.llamadas.append((desde, hasta))
+        return {"procesadas": 1, "ids": [desde]}
+
+    def test_particiones_con_checkpoint_se_saltan_y_se_fusionan(self):
+        AvanceTrabajo.objects.create(trabajo="t", desde=1, hasta=11, resultado={"procesadas": 5, "ids": [0]})
+
+        resultado, fallidas = trabajos.ejecutar_trabajo("t", self.contar, self.PARTICIONES, workers=1)
+
+        self.assertEqual(fallidas, [])
+        self.assertEqual(sorted(self.llamadas), [(11, 21), (21, 31)])
+        self.assertEqual(resultado["procesadas"], 7)
+        self.assertEqual(sorted(resultado["ids"]), [0, 11, 21])
+        self.assertFalse(AvanceTrabajo.objects.filter(trabajo="t").exists())  # completo: sin checkpoints
+
+    def test_particion_fallida_se_informa_y_se_reanuda(self):
+        def falla_la_segunda(desde, hasta):
+            if desde == 11:
+                raise RuntimeError("se cayó la conexión")
+            return self.contar(desde, hasta)
+
+        with self.assertLogs("inventario_core.trabajos", "ERROR"):
+            resultado, fallidas = trabajos.ejecutar_trabajo("t", falla_la_segunda, self.PARTICIONES, workers=1)
+
+        self.assertEqual(fallidas, [(11, 21)])
+        self.assertEqual(resultado["procesadas"], 2)
+        self.assertEqual(
+            set(AvanceTrabajo.objects.filter(trabajo="t").values_list("desde", "hasta")),
+            {(1, 11), (21, 31)},
+        )
+
+        self.llamadas.clear()
+        resultado, fallidas = trabajos.ejecutar_trabajo("t", self.contar, self.PARTICIONES, workers=1)
+        self.assertEqual((self.llamadas, fallidas), ([(11, 21)], []))
+        self.assertEqual(resultado["procesadas"], 3)
+
+    def test_sin_reanudar_borra_los_checkpoints(self):
+        AvanceTrabajo.objects.create(trabajo="t", desde=1, hasta=11, resultado={"procesadas": 5, "ids": [0]})
+        AvanceTrabajo.objects.create(trabajo="otro", desde=1, hasta=11, resultado={})
+
+        resultado, _ = trabajos.ejecutar_trabajo("t", self.contar, self.PARTICIONES, workers=1, reanudar=False)
+
+        self.assertEqual(len(self.llamadas), 3)
+        self.assertEqual(resultado["procesadas"], 3)
+        self.assertTrue(AvanceTrabajo.objects.filter(trabajo="otro").exists())
+
+    def test_fusionar_suma_numeros_y_concatena_listas(self):
+        self.assertEqual(
+            trabajos.fusionar([{"revisados": 2, "sin_base": [3]}, {"revisados": 5, "sin_base": [8, 9]}]),
+            {"revisados": 7, "sin_base": [3, 8, 9]},
+        )
+
+    def test_recalcular_stock_aplicar_solo_corrige_netos_no_negativos(self):
+        descuadrado = self.crear_producto("A", stock=10)
+        sin_base = self.crear_producto("B", stock=5)
+        self.crear_producto("C", stock=0)
+        # Movimientos directos (sin tocar stock_actual), como un histórico importado.
+        Movimiento.objects.create(producto=descuadrado, bodega=self.bodega, tipo=Movimiento.ENTRADA, cantidad=4)
+        Movimiento.objects.create(producto=sin_base, bodega=self.bodega, tipo=Movimiento.SALIDA, cantidad=2)
+
+        salida = StringIO()
+        call_command("recalcular_stock", aplicar=True, workers=1, tamano=2, stdout=salida)
+
+        stock = dict(Producto.objects.values_list("sku", "stock_actual"))
+        self.assertEqual(stock, {"A": 4, "B": 5, "C": 0})
+        self.assertIn("descuadrados: 1 | corregidos: 1", salida.getvalue())
+        self.assertIn(f"Sin base (1): neto de movimientos negativo, revisar a mano: {sin_base.pk}", salida.getvalue())
+        self.assertEqual(valorizacion.verificar(), [])
+
+
+# ───────────────────────────────────────────────────────────────────
+# Ruteo de lecturas a la réplica
+# ───────────────────────────────────────────────────────────────────
+# El router solo lee settings.DATABASES: sobrescribirlo aquí no toca las conexiones.
+warnings.filterwarnings("ignore", "Overriding setting DATABASES", UserWarning)
+
+
+@override_settings(DATABASES={**settings.DATABASES, "replica": settings.DATABASES["default"]})
+class ReplicaRouterTests(SimpleTestCase):
+    MODELOS_PRIMARIO = (Session, User, Group, TokenRevocado, ClaveIdempotencia)
+
+    def leer_en(self, metodo, *modelos):
+        """Alias de lectura de cada modelo dentro de un request `metodo`."""
+        router = ReplicaRouter()
+        alias = {}
+
+        def vista(request):
+            alias.update({m: router.db_for_read(m) for m in modelos})
+
+        LecturaReplicaMiddleware(vista)(getattr(RequestFactory(), metodo)("/productos/"))
+        return alias
+
+    def test_get_lee_de_la_replica(self):
+        self.assertEqual(self.leer_en("get", Producto, Movimiento), {Producto: "replica", Movimiento: "replica"})
+        self.assertEqual(self.leer_en("head", Producto), {Producto: "replica"})
+
+    def test_escrituras_y_sus_lecturas_van_al_primario(self):
+        self.assertEqual(self.leer_en("post", Producto), {Producto: "default"})
+        self.assertEqual(ReplicaRouter().db_for_write(Producto), "default")
+
+    def test_sesiones_auth_y_estado_de_tokens_van_al_primario_aun_en_get(self):
+        alias = self.leer_en("get", *self.MODELOS_PRIMARIO)
+        self.assertEqual(alias, dict.fromkeys(self.MODELOS_PRIMARIO, "default"))
+
+    def test_fuera_de_un_request_lee_del_primario(self):
+        self.assertEqual(ReplicaRouter().db_for_read(Producto), "default")
+
+    @override_settings(DATABASES={"default": {}})
+    def test_sin_replica_configurada_lee_del_primario(self):
+        self.assertEqual(self.leer_en("get", Producto), {Producto: "default"})
+
+
+# ───────────────────────────────────────────────────────────────────
+# Valorización incremental
+# ───────────────────────────────────────────────────────────────────
+class ValorizacionTests(BaseAPITest):
+    def test_deltas_coinciden_con_agregado_completo(self):
+        producto = self.crear_producto(stock=10)
+        self.assertEqual(valorizacion.verificar(), [])
+
+        self.assertEqual(self.mover(producto, "ENTRADA", 5).status_code, status.HTTP_201_CREATED)
+        respuesta = self.mover(producto, "SALIDA", 3)
+        self.assertEqual(respuesta.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(valorizacion.verificar(), [])
+
+        movimiento = respuesta.data["id"]
+        self.client.patch(f"/movimientos/{movimiento}/", {"cantidad": 1}, format="json")
+        self.assertEqual(valorizacion.verificar(), [])
+        self.client.delete(f"/movimientos/{movimiento}/")
+        self.assertEqual(valorizacion.verificar(), [])
+
+        self.client.patch(f"/productos/{producto.pk}/", {
+            "precio": "2500.00", "categoria": self.otra_categoria.pk,
+        }, format="json")
+        self.assertEqual(valorizacion.verificar(), [])
+
+        self.client.delete(f"/productos/{producto.pk}/")
+        self.assertEqual(valorizacion.verificar(), [])
+
+    def test_reporte_lee_totales_corrientes(self):
+        self.crear_producto("A", precio="100.00", stock=3)
+        self.crear_producto("B", precio="50.00", stock=2, categoria=self.otra_categoria)
+
+        respuesta = self.client.get("/reportes/valorizacion/")
+        self.assertEqual(respuesta.status_code, status.HTTP_200_OK)
+        self.assertEqual(Decimal(respuesta.data["total"]), Decimal("400.00"))
+        self.assertEqual(
+            {g["nombre"]: Decimal(g["valor"]) for g in respuesta.data["categorias"]},
+            {"Bebidas": Decimal("300.00"), "Snacks": Decimal("100.00")},
+        )
+
+    def test_movimientos_sobre_instancias_desactualizadas_no_se_pierden(self):
+        # Dos requests concurrentes que cargaron el mismo producto antes de moverlo.
+        self.crear_producto(stock=10)
+        primera, segunda = Producto.objects.get(), Producto.objects.get()
+
+        _aplicar_delta_stock(primera, Movimiento.SALIDA, 2)
+        _aplicar_delta_stock(segunda, Movimiento.SALIDA, 3)
+
+        self.assertEqual(Producto.objects.get().stock_actual, 5)
+        self.assertEqual(valorizacion.verificar(), [])
+
+    def test_salida_revalida_stock_con_la_fila_bloqueada(self):
+        self.crear_producto(stock=4)
+        desactualizada = Producto.objects.get()
+        _aplicar_delta_stock(Producto.objects.get(), Movimiento.SALIDA, 3)
+
+        with self.assertRaises(DjangoValidationError):
+            _aplicar_delta_stock(desactualizada, Movimiento.SALIDA, 2)
+
+
+# ───────────────────────────────────────────────────────────────────
+# Idempotency-Key
+# ───────────────────────────────────────────────────────────────────
+class IdempotenciaTests(BaseAPITest):
+    CLAVE = {"HTTP_IDEMPOTENCY_KEY": "handheld-7:0001"}
+
+    def setUp(self):
+        super().setUp()
+        self.producto = self.crear_producto(stock=10)
+
+    def test_reintento_devuelve_la_respuesta_guardada(self):
+        primera = self.mover(self.producto, "SALIDA", 2, **self.CLAVE)
+        segunda = self.mover(self.producto, "SALIDA", 2, **self.CLAVE)
+
+        self.assertEqual(primera.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(segunda.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(segunda["Idempotent-Replayed"], "true")
+        self.assertEqual(segunda.data, primera.data)
+        self.assertEqual(Movimiento.objects.count(), 1)
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock_actual, 8)
+
+    def test_sin_clave_no_deduplica(self):
+        self.mover(self.producto, "SALIDA", 2)
+        self.mover(self.producto, "SALIDA", 2)
+        self.assertEqual(Movimiento.objects.count(), 2)
+
+    def test_misma_clave_con_otro_contenido_es_422(self):
+        self.mover(self.producto, "SALIDA", 2, **self.CLAVE)
+        respuesta = self.mover(self.producto, "SALIDA", 3, **self.CLAVE)
+
+        self.assertEqual(respuesta.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Movimiento.objects.count(), 1)
+
+    def test_misma_clave_en_otro_endpoint_es_422(self):
+        ClaveIdempotencia.objects.create(
+            usuario=self.admin, clave=self.CLAVE["HTTP_IDEMPOTENCY_KEY"], ruta="otro-create",
+            huella="0" * 64, status_code=201, respuesta={"id": 999},
+        )
+        respuesta = self.mover(self.producto, "SALIDA", 2, **self.CLAVE)
+
+        self.assertEqual(respuesta.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertNotEqual(respuesta.data, {"id": 999})
+        self.assertFalse(Movimiento.objects.exists())
+
+    def test_las_claves_son_por_usuario(self):
+        self.mover(self.producto, "SALIDA", 2, **self.CLAVE)
+        self.client.force_authenticate(self.vendedor)
+        respuesta = self.mover(self.producto, "SALIDA", 2, **self.CLAVE)
+
+        self.assertEqual(respuesta.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("Idempotent-Replayed", respuesta)
+        self.assertEqual(Movimiento.objects.count(), 2)
+
+    def test_error_no_se_guarda_y_se_puede_reintentar(self):
+        respuesta = self.mover(self.producto, "SALIDA", 50, **self.CLAVE)
+        self.assertEqual(respuesta.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ClaveIdempotencia.objects.exists())
+
+        respuesta = self.mover(self.producto, "SALIDA", 50, **self.CLAVE)
+        self.assertEqual(respuesta.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_carrera_con_la_misma_clave_es_409_y_revierte(self):
+        # Otro request insertó la clave entre nuestra lectura y nuestro INSERT.
+        ClaveIdempotencia.objects.create(
+            usuario=self.admin, clave=self.CLAVE["HTTP_IDEMPOTENCY_KEY"], ruta="movimientos-create",
+            huella="0" * 64, status_code=201, respuesta={},
+        )
+        with mock.patch.object(ClaveIdempotencia.objects, "get", side_effect=ClaveIdempotencia.DoesNotExist):
+            respuesta = self.mover(self.producto, "SALIDA", 2, **self.CLAVE)
+
+        self.assertEqual(respuesta.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Movimiento.objects.exists())
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.stock_actual, 10)
+
+    def test_clave_vencida_se_procesa_de_nuevo_y_se_purga(self):
+        self.mover(self.producto, "SALIDA", 2, **self.CLAVE)
+        ClaveIdempotencia.objects.update(creada=timezone.now() - timedelta(days=2))
+
+        respuesta = self.mover(self.producto, "SALIDA", 2, **self.CLAVE)
+        self.assertEqual(respuesta.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("Idempotent-Replayed", respuesta)
+        self.assertEqual(Movimiento.objects.count(), 2)
+
+        ClaveIdempotencia.objects.update(creada=timezone.now() - timedelta(days=2))
+        salida = StringIO()
+        call_command("purgar_idempotencia", stdout=salida)
+        self.assertIn("Claves eliminadas: 1", salida.getvalue())
+        self.assertFalse(ClaveIdempotencia.objects.exists())
+
+    def test_clave_demasiado_larga_es_400(self):
+        respuesta = self.mover(self.producto, "SALIDA", 2, HTTP_IDEMPOTENCY_KEY="x" * 256)
+        self.assertEqual(respuesta.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(CABECERA, respuesta.data["detail"])
+
+
+# ───────────────────────────────────────────────────────────────────
+# Sugerencias de reposición
+# ───────────────────────────────────────────────────────────────────
+@skipUnless(find_spec("numpy"), "numpy no instalado")
+class ReposicionTests(BaseAPITest):
+    PARAMS = {"dias": 10, "ventana": 5, "plazo": 4, "objetivo": 3}
+    URL = "/productos/sugerencias_reposicion/?dias=10&ventana=5&plazo=4&objetivo=3"
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.otro_proveedor = Proveedor.objects.create(
+            razon_social="Importadora Norte", rut="77.654.321-0", email="norte@x.cl", telefono="1"
+        )
+
+    def demanda(self, producto, por_dia):
+        """por_dia[k] = unidades que salieron hace k días (SALIDA, o MERMA en días impares)."""
+        ahora = timezone.now()
+        for hace, cantidad in enumerate(por_dia):
+            if cantidad:
+                tipo = Movimiento.MERMA if hace % 2 else Movimiento.SALIDA
+                Movimiento.objects.create(producto=producto, bodega=self.bodega, tipo=tipo,
+                                          cantidad=cantidad, fecha=ahora - timedelta(days=hace))
+
+    def setUp(self):
+        super().setUp()
+        # A: 0 los 5 días más antiguos y 2 los 5 recientes → media 1, móvil 2, desviación 1.
+        self.a = self.crear_producto("A", stock=6)
+        self.demanda(self.a, [2, 2, 2, 2, 2, 0, 0, 0, 0, 0])
+        Movimiento.objects.create(producto=self.a, bodega=self.bodega, tipo=Movimiento.ENTRADA, cantidad=50)
+        # B (otro proveedor) y C: 1 por día; C con menos stock es el más urgente.
+        self.b = self.crear_producto("B", stock=2, proveedor=self.otro_proveedor)
+        self.demanda(self.b, [1] * 10)
+        self.c = self.crear_producto("C", stock=1)
+        self.demanda(self.c, [1] * 10)
+        # D: sin demanda; E: con demanda pero stock de sobra.
+        self.crear_producto("D", stock=0)
+        self.e = self.crear_producto("E", stock=500)
+        self.demanda(self.e, [1] * 10)
+
+    def test_indicadores_de_una_serie_conocida(self):
+        grupos = reposicion.calcular(z=1, **self.PARAMS)
+        a = next(p for g in grupos for p in g["productos"] if p["sku"] == "A")
+
+        self.assertEqual(a["demanda_diaria"], 1.0)
+        self.assertEqual(a["media_movil"], 2.0)
+        self.assertEqual(a["desviacion"], 1.0)
+        self.assertEqual(a["dias_cobertura"], 3.0)      # stock 6 / tasa max(1, 2)
+        self.assertEqual(a["punto_reorden"], 10.0)      # 2 × 4 + 1 × 1 × √4
+        self.assertEqual(a["cantidad_sugerida"], 10)    # ⌈2 × (4 + 3) + 2 − 6⌉
+
+    def test_orden_por_cobertura_y_agrupado_por_proveedor(self):
+        grupos = reposicion.calcular(z=1, **self.PARAMS)
+
+        self.assertEqual(
+            [(g["proveedor"], [p["sku"] for p in g["productos"]]) for g in grupos],
+            [("Distribuidora Sur", ["C", "A"]), ("Importadora Norte", ["B"])],
+        )
+        b = grupos[1]["productos"][0]
+        self.assertEqual((b["dias_cobertura"], b["punto_reorden"], b["cantidad_sugerida"]), (2.0, 4.0, 5))
+
+    def test_sin_demanda_con_stock_de_sobra_o_eliminado_no_aparece(self):
+        # Producto eliminado entre la consulta de demanda y la de productos.
+        vivos = Producto.objects.exclude(pk=self.c.pk)
+        with mock.patch.object(reposicion.Producto, "objects", vivos):
+            grupos = reposicion.calcular(z=1, **self.PARAMS)
+
+        skus = {p["sku"] for g in grupos for p in g["productos"]}
+        self.assertEqual(skus, {"A", "B"})
+
+    def test_parametros_invalidos_son_400(self):
+        for params in ("dias=0", "dias=400", "dias=5&ventana=7", "plazo=-1", "objetivo=-2", "dias=muchos"):
+            with self.subTest(params=params):
+                respuesta = self.client.get(f"/productos/sugerencias_reposicion/?{params}")
+                self.assertEqual(respuesta.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def skus(self):
+        respuesta = self.client.get(self.URL)
+        self.assertEqual(respuesta.status_code, status.HTTP_200_OK)
+        return {p["sku"] for g in respuesta.data for p in g["productos"]}
+
+    def test_un_movimiento_invalida_la_cache(self):
+        self.assertIn("B", self.skus())
+
+        # update() no invalida: sigue la respuesta cacheada.
+        Producto.objects.filter(pk=self.b.pk).update(stock_actual=100)
+        self.assertIn("B", self.skus())
+
+        Producto.objects.filter(pk=self.b.pk).update(stock_actual=2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.mover(self.b, "ENTRADA", 10).status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("B", self.skus())
+
+    @mock.patch.object(trabajos, "connections", mock.MagicMock())
+    @mock.patch.object(trabajos, "ProcessPoolExecutor", _EjecutorEnLinea)
+    def test_recalcular_stock_aplicar_invalida_la_cache(self):
+        with mock.patch.object(reposicion, "invalidar") as invalidar:
+            call_command("recalcular_stock", aplicar=True, workers=1, stdout=StringIO())
+        invalidar.assert_called_once_with()
+
+
+# ───────────────────────────────────────────────────────────────────
+# JWT con roles en los claims y revocación
+# ───────────────────────────────────────────────────────────────────
+class JWTRolesTests(BaseAPITest):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(None)
+        _revocaciones["vence"] = 0.0  # la caché del proceso sobrevive al rollback de cada test
+
+    def login(self, usuario):
+        respuesta = self.client.post("/auth/jwt/create/", {
+            "username": usuario.username, "password": "clave-segura-123",
+        }, format="json")
+        self.assertEqual(respuesta.status_code, status.HTTP_200_OK)
+        return respuesta.data
+
+    def refrescar(self, tokens):
+        return self.client.post("/auth/jwt/refresh/", {"refresh": tokens["refresh"]}, format="json")
+
+    def como(self, tokens):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+
+    def crear_categoria(self, nombre="Lácteos"):
+        return self.client.post("/categorias/", {"nombre": nombre}, format="json")
+
+    def assertRevocado(self, respuesta):
+        # SessionAuthentication va primero y no define WWW-Authenticate: DRF responde 403.
+        self.assertEqual(respuesta.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(str(respuesta.data["detail"]), "El token fue revocado.")
+
+    def test_get_autenticado_no_consulta_usuario_ni_grupos(self):
+        self.como(self.login(self.consultor))
+        self.client.get("/categorias/")  # carga la caché de revocaciones
+
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get("/categorias/")
+
+        self.assertEqual(respuesta.status_code, status.HTTP_200_OK)
+        sql = " ".join(q["sql"] for q in consultas.captured_queries)
+        self.assertNotIn("auth_user", sql)
+        self.assertNotIn("auth_group", sql)
+
+    def test_roles_del_token_aplican_permisos(self):
+        self.como(self.login(self.consultor))
+        self.assertEqual(self.crear_categoria().status_code, status.HTTP_403_FORBIDDEN)
+        self.como(self.login(self.admin))
+        self.assertEqual(self.crear_categoria().status_code, status.HTTP_201_CREATED)
+
+    def test_logout_revoca_access_y_refresh(self):
+        tokens = self.login(self.vendedor)
+        self.como(tokens)
+        self.assertEqual(self.client.post("/auth/jwt/logout/").status_code, status.HTTP_204_NO_CONTENT)
+
+        self.assertRevocado(self.client.get("/categorias/"))
+        self.client.credentials()
+        self.assertEqual(self.refrescar(tokens).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_quitar_grupo_revoca_tokens_y_el_refresh(self):
+        tokens = self.login(self.admin)
+        self.admin.groups.remove(Group.objects.get(name="Administrador"))
+
+        self.como(tokens)
+        self.assertRevocado(self.crear_categoria())
+        self.client.credentials()
+        self.assertEqual(self.refrescar(tokens).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        # Un login nuevo (aunque sea en el mismo segundo) trae los roles actuales.
+        self.como(self.login(self.admin))
+        self.assertEqual(self.crear_categoria().status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_cambios_desde_el_grupo_revocan_a_sus_miembros(self):
+        tokens = self.login(self.vendedor)
+        grupo = Group.objects.get(name="Vendedor")
+        grupo.user_set.clear()
+
+        self.como(tokens)
+        self.assertRevocado(self.client.get("/categorias/"))
+
+        tokens = self.login(self.consultor)
+        grupo = Group.objects.get(name="Consultor")
+        grupo.name = "Auditor"
+        grupo.save()
+        self.como(tokens)
+        self.assertRevocado(self.client.get("/categorias/"))
+
+    def test_cambiar_is_superuser_o_deshabilitar_revoca(self):
+        tokens = self.login(self.consultor)
+        self.consultor.is_superuser = True
+        self.consultor.save()
+        self.como(tokens)
+        self.assertRevocado(self.client.get("/categorias/"))
+
+        tokens = self.login(self.vendedor)
+        self.vendedor.is_active = False
+        self.vendedor.save()
+        self.como(tokens)
+        self.assertRevocado(self.client.get("/categorias/"))
+
+    def test_guardar_otros_campos_no_revoca(self):
+        tokens = self.login(self.consultor)
+        self.consultor.last_login = timezone.now()
+        self.consultor.save(update_fields=["last_login"])
+        self.consultor.first_name = "Ana"
+        self.consultor.save()
+
+        self.como(tokens)
+        self.assertEqual(self.client.get("/categorias/").status_code, status.HTTP_200_OK)
+        self.client.credentials()
+        self.assertEqual(self.refrescar(tokens).status_code, status.HTTP_200_OK)
+
+
+# ───────────────────────────────────────────────────────────────────
+# Campos dinámicos, MessagePack y compresión
+# ───────────────────────────────────────────────────────────────────
+class RespuestasTests(BaseAPITest):
+    def setUp(self):
+        super().setUp()
+        for i in range(30):
+            self.crear_producto(f"SKU-{i:03d}", stock=i)
+
+    def test_fields_recorta_respuesta_y_select(self):
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get("/productos/?fields=id,sku")
+
+        self.assertEqual(respuesta.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(respuesta.data["results"][0]), {"id", "sku"})
+        sql = next(q["sql"] for q in consultas.captured_queries if 'FROM "inventario_core_producto"' in q["sql"]
+                   and "COUNT" not in q["sql"])
+        self.assertNotIn("JOIN", sql)
+        self.assertNotIn('"precio"', sql)
+
+    def test_fields_con_relacion_hace_solo_su_join(self):
+        respuesta = self.client.get("/productos/?fields=sku,categoria_nombre")
+        self.assertEqual(respuesta.data["results"][0]["categoria_nombre"], "Bebidas")
+        self.assertEqual(set(respuesta.data["results"][0]), {"sku", "categoria_nombre"})
+
+    def test_omit_quita_campos(self):
+        respuesta = self.client.get("/productos/?omit=proveedor_nombre,categoria_nombre")
+        campos = set(respuesta.data["results"][0])
+        self.assertNotIn("proveedor_nombre", campos)
+        self.assertIn("stock_actual", campos)
+
+    def test_campo_desconocido_es_400(self):
+        respuesta = self.client.get("/productos/?fields=sku,costo")
+        self.assertEqual(respuesta.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("costo", str(respuesta.data))
+
+    def test_fields_en_historico(self):
+        producto = Producto.objects.get(sku="SKU-010")
+        self.mover(producto, "SALIDA", 1)
+        respuesta = self.client.get(f"/productos/{producto.pk}/historico/?fields=tipo,cantidad")
+        self.assertEqual(respuesta.data["historico"], [{"tipo": "SALIDA", "cantidad": 1}])
+
+    @skipUnless(find_spec("msgpack"), "msgpack no instalado")
+    def test_messagepack(self):
+        import msgpack
+
+        respuesta = self.client.get("/productos/?fields=sku&limit=2", HTTP_ACCEPT="application/msgpack")
+        self.assertEqual(respuesta["Content-Type"], "application/msgpack")
+        self.assertEqual(msgpack.unpackb(respuesta.content)["results"], [{"sku": "SKU-000"}, {"sku": "SKU-001"}])
+
+    @skipUnless(find_spec("brotli"), "brotli no instalado")
+    def test_brotli_solo_para_la_api(self):
+        import brotli
+
+        respuesta = self.client.get("/productos/", HTTP_ACCEPT="application/json", HTTP_ACCEPT_ENCODING="br, gzip")
+        self.assertEqual(respuesta["Content-Encoding"], "br")
+        self.assertIn(b"SKU-000", brotli.decompress(respuesta.content))
+
+        # HTML con token CSRF: gzip (con el relleno contra BREACH), nunca brotli.
+        respuesta = self.client.get("/admin/login/", HTTP_ACCEPT_ENCODING="br, gzip")
+        self.assertEqual(respuesta["Content-Encoding"], "gzip")
+        self.assertIn(b"csrfmiddlewaretoken", gzip.decompress(respuesta.content))
+
+
+# ───────────────────────────────────────────────────────────────────
+# Warm-up de workers
+# ───────────────────────────────────────────────────────────────────
+class CalentamientoTests(TestCase):
+    def calentar(self):
+        with self.assertLogs("inventario_core.calentamiento", "INFO") as logs:
+            calentamiento.calentar()
+        self.assertEqual([r.levelname for r in logs.records], ["INFO"])  # sin "Warm-up: falló ..."
+
+    @override_settings(CALENTAR_CONEXIONES=False)
+    def test_calentar_sin_errores_y_sin_conexiones(self):
+        with mock.patch.object(calentamiento, "_conexiones") as conexiones:
+            self.calentar()
+        conexiones.assert_not_called()
+
+    @override_settings(CALENTAR_CONEXIONES=True)
+    def test_calentar_con_conexiones_cierra_antes_de_fork(self):
+        with mock.patch.object(calentamiento.os, "register_at_fork") as register_at_fork:
+            self.calentar()
+        register_at_fork.assert_called_once_with(before=calentamiento.connections.close_all)
+
+    def test_ready_solo_calienta_con_calentar_arranque(self):
+        config = apps.get_app_config("inventario_core")
+        with mock.patch.object(calentamiento, "calentar") as calentar:
+            with override_settings(CALENTAR_ARRANQUE=False):
+                config.ready()
+            calentar.assert_not_called()
+            with override_settings(CALENTAR_ARRANQUE=True):
+                config.ready()
+            calentar.assert_called_once_with()
+
+
+# ───────────────────────────────────────────────────────────────────
+# Gobernador de consultas
+# ───────────────────────────────────────────────────────────────────
+class GobernadorTests(BaseAPITest):
+    def setUp(self):
+        super().setUp()
+        for i in range(5):
+            self.crear_producto(f"SKU-{i:03d}")
+
+    def test_busqueda_corta_o_con_demasiados_terminos_es_400(self):
+        self.assertEqual(self.client.get("/productos/?search=ab").status_code, status.HTTP_400_BAD_REQUEST)
+        respuesta = self.client.get("/movimientos/?search=uno dos tres cuatro cinco seis")
+        self.assertEqual(respuesta.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get("/productos/?search=SKU").status_code, status.HTTP_200_OK)
+
+    @override_settings(GOBERNADOR={"PAGINA_DEFECTO": 2, "PAGINA_MAXIMA": 3})
+    def test_paginacion_acotada(self):
+        self.assertEqual(len(self.client.get("/productos/").data["results"]), 2)
+        respuesta = self.client.get("/productos/?limit=1000")
+        self.assertEqual(len(respuesta.data["results"]), 3)
+        self.assertEqual(respuesta.data["count"], 5)
+
+    def test_consulta_interrumpida_es_503(self):
+        with mock.patch.object(ProductoViewSet, "list", side_effect=OperationalError("interrupted")):
+            respuesta = self.client.get("/productos/")
+        self.assertEqual(respuesta.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    def test_timeout_corta_la_consulta(self):
+        activar_timeout("default", 1)
+        try:
+            with self.assertRaises(OperationalError) as error, transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 50000000) "
+                        "SELECT COUNT(*) FROM n"
+                    )
+        finally:
+            desactivar_timeout("default")
+        self.assertTrue(consulta_interrumpida(error.exception))
+
+    @override_settings(GOBERNADOR={"TASAS_POR_ROL": {"Consultor": (4, 0.01), "otros": (1, 0.01)},
+                                   "COSTO_BUSQUEDA": 2})
+    def test_limite_por_rol_es_429(self):
+        # Balde de 4: un listado (1) + una búsqueda (1 + 2) lo vacían.
+        self.client.force_authenticate(self.consultor)
+        self.assertEqual(self.client.get("/productos/").status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get("/productos/?search=SKU").status_code, status.HTTP_200_OK)
+
+        respuesta = self.client.get("/productos/")
+        self.assertEqual(respuesta.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", respuesta)
+
+        # El balde es por usuario: otro rol no se ve afectado.
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self.client.get("/productos/").status_code, status.HTTP_200_OK)
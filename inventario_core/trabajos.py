@@ -0,0 +1,161 @@
+"""
+Runner genérico para trabajos por lotes (recálculos / backfills) sobre el histórico.
+
+- Particiona por rango de ids de Producto.
+- Ejecuta cada partición en un ProcessPoolExecutor (cada worker abre su propia conexión).
+- Guarda el resultado de cada partición en AvanceTrabajo, así un trabajo cortado se reanuda.
+- Fusiona los resultados parciales (por defecto suma clave a clave).
+
+Las tareas deben ser funciones de módulo (picklables) con firma tarea(desde, hasta) -> dict.
+Para pasar parámetros extra usar functools.partial.
+
+Con "spawn" (Windows, macOS) o "forkserver" (Linux desde Python 3.14) el hijo importa
+este módulo para deserializar el initializer y las tareas ANTES de django.setup():
+por eso aquí los modelos se importan dentro de cada función, nunca a nivel de módulo.
+Un módulo de tareas externo debe seguir la misma regla.
+"""
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.db import connections
+from django.db.models import Case, F, IntegerField, Max, Min, Sum, When
+
+logger = logging.getLogger(__name__)
+
+
+# ───────────────────────────────────────────────────────────────────
+# Particiones y fusión
+# ───────────────────────────────────────────────────────────────────
+def particionar(tamano: int) -> list[tuple[int, int]]:
+    """
+    Rangos [desde, hasta) que cubren todos los ids de Producto, de `tamano` ids cada uno.
+    """
+    from .models import Producto
+
+    limites = Producto.objects.aggregate(minimo=Min("id"), maximo=Max("id"))
+    if limites["minimo"] is None:
+        return []
+    fin = limites["maximo"] + 1
+    return [(i, min(i + tamano, fin)) for i in range(limites["minimo"], fin, tamano)]
+
+
+def fusionar(resultados: list[dict]) -> dict:
+    """Suma (o concatena, si son listas) clave a clave los resultados parciales."""
+    total = {}
+    for resultado in resultados:
+        for clave, valor in resultado.items():
+            total[clave] = total[clave] + valor if clave in total else valor
+    return total
+
+
+# ───────────────────────────────────────────────────────────────────
+# Ejecución
+# ───────────────────────────────────────────────────────────────────
+def _iniciar_worker() -> None:
+    # Con "fork" el hijo hereda Django ya configurado y setup() solo repite el
+    # populate (idempotente); con "spawn"/"forkserver" arranca de cero.
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "inventario.settings")
+    django.setup()
+
+
+def ejecutar_trabajo(nombre: str, tarea, particiones, workers=None, reanudar=True, fusion=fusionar):
+    """
+    Ejecuta `tarea` sobre cada partición pendiente y devuelve (resultado, fallidas).
+
+    - reanudar=True: las particiones con checkpoint se saltan y su resultado se reutiliza.
+    - reanudar=False: se borran los checkpoints de `nombre` y se parte de cero.
+    - Los checkpoints se escriben desde el proceso principal (un solo escritor de AvanceTrabajo)
+      y se borran al terminar sin fallos.
+    """
+    from .models import AvanceTrabajo
+
+    particiones = [tuple(p) for p in particiones]
+    if not reanudar:
+        AvanceTrabajo.objects.filter(trabajo=nombre).delete()
+
+    hechos = {
+        (a.desde, a.hasta): a.resultado
+        for a in AvanceTrabajo.objects.filter(trabajo=nombre)
+    }
+    resultados = [hechos[p] for p in particiones if p in hechos]
+    pendientes = [p for p in particiones if p not in hechos]
+    logger.info("%s: %d particiones (%d ya hechas)", nombre, len(particiones), len(resultados))
+
+    fallidas = []
+    if pendientes:
+        # Un hijo forkeado no debe heredar conexiones abiertas del padre
+        # (con spawn/forkserver no se heredan, pero cerrarlas no cuesta nada).
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_worker) as pool:
+            futuros = {pool.submit(tarea, desde, hasta): (desde, hasta) for desde, hasta in pendientes}
+            for futuro in as_completed(futuros):
+                desde, hasta = futuros[futuro]
+                try:
+                    resultado = futuro.result()
+                except Exception:
+                    logger.exception("%s: falló la partición [%d, %d)", nombre, desde, hasta)
+                    fallidas.append((desde, hasta))
+                    continue
+                AvanceTrabajo.objects.update_or_create(
+                    trabajo=nombre, desde=desde, hasta=hasta,
+                    defaults={"resultado": resultado},
+                )
+                resultados.append(resultado)
+
+    if not fallidas:
+        # Trabajo completo: la próxima ejecución debe partir de cero.
+        AvanceTrabajo.objects.filter(trabajo=nombre).delete()
+    return fusion(resultados), fallidas
+
+
+# ───────────────────────────────────────────────────────────────────
+# Tareas
+# ───────────────────────────────────────────────────────────────────
+def recalcular_stock(desde: int, hasta: int, aplicar: bool = False) -> dict:
+    """
+    Reconciliación de stock_actual contra la suma de movimientos de cada producto:
+      ENTRADA suma, SALIDA / MERMA restan.
+
+    stock_actual también se puede fijar al crear o editar el producto sin registrar
+    una ENTRADA, así que un neto negativo no es un stock "esperado": esos productos
+    se informan en `sin_base` y nunca se corrigen. Con aplicar=True se corrigen los
+    descuadrados con neto >= 0.
+    """
+    from .models import Movimiento, Producto
+
+    firmado = Case(
+        When(tipo=Movimiento.ENTRADA, then=F("cantidad")),
+        default=-F("cantidad"),
+        output_field=IntegerField(),
+    )
+    netos = dict(
+        Movimiento.objects
+        .filter(producto_id__gte=desde, producto_id__lt=hasta)
+        .order_by()
+        .values("producto_id")
+        .annotate(neto=Sum(firmado))
+        .values_list("producto_id", "neto")
+    )
+
+    productos = Producto.objects.filter(id__gte=desde, id__lt=hasta).only("id", "stock_actual")
+    revisados, descuadrados, sin_base = 0, [], []
+    for producto in productos.iterator(chunk_size=2000):
+        revisados += 1
+        esperado = netos.get(producto.id) or 0
+        if esperado < 0:
+            sin_base.append(producto.id)
+        elif producto.stock_actual != esperado:
+            producto.stock_actual = esperado
+            descuadrados.append(producto)
+
+    if aplicar and descuadrados:
+        Producto.objects.bulk_update(descuadrados, ["stock_actual"], batch_size=500)
+
+    return {
+        "revisados": revisados,
+        "descuadrados": len(descuadrados),
+        "corregidos": len(descuadrados) if aplicar else 0,
+        "sin_base": sin_base,
+    }
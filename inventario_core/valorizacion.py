@@ -0,0 +1,155 @@
+"""
+Valorización de inventario (precio × stock_actual) por categoría y proveedor.
+
+Los totales viven en ValorizacionGrupo y se ajustan por deltas cada vez que se guarda
+o elimina un Producto (señales en signals.py), así el reporte lee O(n° de grupos) filas
+en vez de agregar toda la tabla de productos.
+
+Ojo: QuerySet.update() / bulk_update() no disparan señales. Quien los use sobre
+precio/stock/categoría/proveedor debe llamar a reconstruir() al terminar.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, F, Sum
+
+from .models import Categoria, Producto, Proveedor, ValorizacionGrupo
+
+_DIMENSIONES = (
+    (ValorizacionGrupo.CATEGORIA, 0, "categoria_id"),
+    (ValorizacionGrupo.PROVEEDOR, 1, "proveedor_id"),
+)
+_CAMPOS = ("categoria", "proveedor", "precio", "stock_actual")
+
+
+# ───────────────────────────────────────────────────────────────────
+# Deltas
+# ───────────────────────────────────────────────────────────────────
+def estado_en_bd(pk):
+    """Estado (categoria_id, proveedor_id, precio, stock_actual) guardado, o None."""
+    return (
+        Producto.objects.filter(pk=pk)
+        .values_list("categoria_id", "proveedor_id", "precio", "stock_actual")
+        .first()
+    )
+
+
+def estado_guardado(previo, producto, update_fields=None):
+    """
+    Estado que quedó en la BD tras producto.save(update_fields=...):
+    los campos no guardados (o diferidos) conservan el valor previo.
+    """
+    actual = producto.__dict__
+    estado = []
+    for i, campo in enumerate(_CAMPOS):
+        attname = producto._meta.get_field(campo).attname
+        guardado = update_fields is None or campo in update_fields or attname in update_fields
+        if guardado and attname in actual:
+            estado.append(actual[attname])
+        else:
+            estado.append(previo[i] if previo else None)
+    return tuple(estado)
+
+
+def aplicar(previo, nuevo) -> None:
+    """
+    Resta el estado previo y suma el nuevo en cada grupo afectado.
+    Si el producto no cambia de grupo, queda un solo UPDATE por dimensión.
+    """
+    deltas = {}
+    for estado, signo in ((previo, -1), (nuevo, 1)):
+        if not estado or None in estado:
+            continue
+        precio, stock = Decimal(str(estado[2])), estado[3]
+        for dimension, i, _ in _DIMENSIONES:
+            valor, unidades = deltas.get((dimension, estado[i]), (Decimal(0), 0))
+            deltas[(dimension, estado[i])] = (valor + signo * precio * stock, unidades + signo * stock)
+
+    for (dimension, grupo_id), (valor, unidades) in deltas.items():
+        if valor or unidades:
+            _sumar(dimension, grupo_id, valor, unidades)
+
+
+def _sumar(dimension, grupo_id, valor, unidades) -> None:
+    filas = ValorizacionGrupo.objects.filter(dimension=dimension, grupo_id=grupo_id)
+    cambios = {"valor": F("valor") + valor, "unidades": F("unidades") + unidades}
+    if not filas.update(**cambios):
+        # Primer producto del grupo: crear en 0 y sumar, seguro ante creaciones concurrentes.
+        ValorizacionGrupo.objects.get_or_create(dimension=dimension, grupo_id=grupo_id)
+        filas.update(**cambios)
+
+
+# ───────────────────────────────────────────────────────────────────
+# Lectura y consistencia
+# ───────────────────────────────────────────────────────────────────
+def leer() -> dict:
+    """Reporte desde los totales corrientes (O(n° de grupos))."""
+    nombres = {
+        ValorizacionGrupo.CATEGORIA: dict(Categoria.objects.values_list("id", "nombre")),
+        ValorizacionGrupo.PROVEEDOR: dict(Proveedor.objects.values_list("id", "razon_social")),
+    }
+    grupos = {ValorizacionGrupo.CATEGORIA: [], ValorizacionGrupo.PROVEEDOR: []}
+    total = Decimal(0)
+    for dimension, grupo_id, valor, unidades in ValorizacionGrupo.objects.values_list(
+        "dimension", "grupo_id", "valor", "unidades"
+    ):
+        grupos[dimension].append({
+            "id": grupo_id,
+            "nombre": nombres[dimension].get(grupo_id),
+            "valor": str(valor),
+            "unidades": unidades,
+        })
+        if dimension == ValorizacionGrupo.CATEGORIA:
+            total += valor
+
+    return {
+        "total": str(total),
+        "categorias": sorted(grupos[ValorizacionGrupo.CATEGORIA], key=lambda g: -Decimal(g["valor"])),
+        "proveedores": sorted(grupos[ValorizacionGrupo.PROVEEDOR], key=lambda g: -Decimal(g["valor"])),
+    }
+
+
+def calcular_completo() -> dict:
+    """{(dimension, grupo_id): (valor, unidades)} agregando toda la tabla Producto."""
+    valor = Sum(F("precio") * F("stock_actual"), output_field=DecimalField(max_digits=18, decimal_places=2))
+    resultado = {}
+    for dimension, _, campo in _DIMENSIONES:
+        filas = (
+            Producto.objects.order_by()
+            .values(campo)
+            .annotate(valor=valor, unidades=Sum("stock_actual"))
+            .values_list(campo, "valor", "unidades")
+        )
+        for grupo_id, total, unidades in filas:
+            resultado[(dimension, grupo_id)] = (Decimal(str(total or 0)).quantize(Decimal("0.01")), unidades or 0)
+    return resultado
+
+
+def verificar() -> list[dict]:
+    """Diferencias entre los totales corrientes y el agregado completo."""
+    esperado = calcular_completo()
+    guardado = {
+        (d, g): (v, u)
+        for d, g, v, u in ValorizacionGrupo.objects.values_list("dimension", "grupo_id", "valor", "unidades")
+    }
+    diferencias = []
+    for clave in sorted(esperado.keys() | guardado.keys()):
+        esp = esperado.get(clave, (Decimal("0.00"), 0))
+        gua = guardado.get(clave, (Decimal("0.00"), 0))
+        if esp != gua:
+            diferencias.append({
+                "dimension": clave[0], "grupo_id": clave[1],
+                "esperado": str(esp[0]), "guardado": str(gua[0]),
+                "unidades_esperadas": esp[1], "unidades_guardadas": gua[1],
+            })
+    return diferencias
+
+
+@transaction.atomic
+def reconstruir() -> None:
+    """Reemplaza los totales corrientes por el agregado completo."""
+    ValorizacionGrupo.objects.all().delete()
+    ValorizacionGrupo.objects.bulk_create([
+        ValorizacionGrupo(dimension=d, grupo_id=g, valor=v, unidades=u)
+        for (d, g), (v, u) in calcular_completo().items()
+    ])
@@ -1,21 +1,46 @@
-from django.core.exceptions import ValidationError as DjangoValidationError
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
 from django.db import transaction
 from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from .models import Categoria, Proveedor, Bodega, Producto, Movimiento
 from .serializers import (
     CategoriaSerializer, ProveedorSerializer, BodegaSerializer,
-    ProductoSerializer, MovimientoSerializer
+    ProductoSerializer, MovimientoSerializer, campos_solicitados
 )
 from .permissions import RolCompositePermission
+from .authentication import revocar_sesion
+from .idempotencia import idempotente
+from .gobernador import BusquedaAcotada, GobernadorMixin
+from . import reposicion, valorizacion
 
 
 # ───────────────────────────────────────────────────────────────────
 # Utilidades internas para stock
 # ───────────────────────────────────────────────────────────────────
+def _mover_stock(producto: Producto, delta: int) -> None:
+    """
+    Suma `delta` a stock_actual con la fila del producto bloqueada hasta el commit.
+    Se relee la fila: dos movimientos concurrentes del mismo producto se serializan
+    y cada uno parte del stock (y del estado de valorización) que dejó el otro.
+    El serializer valida contra el stock leído sin bloqueo; aquí se revalida
+    (DjangoValidationError → 400 en las vistas).
+    """
+    bloqueado = Producto.objects.select_for_update().get(pk=producto.pk)
+    disponible = bloqueado.stock_actual or 0
+    if disponible + delta < 0:
+        raise DjangoValidationError(f"No hay stock suficiente (disponible: {disponible}).")
+    bloqueado.stock_actual = disponible + delta
+    bloqueado.save(update_fields=["stock_actual"])
+    producto.stock_actual = bloqueado.stock_actual
+    transaction.on_commit(reposicion.invalidar)
+
+
 def _aplicar_delta_stock(producto: Producto, tipo: str, cantidad: int) -> None:
     """
     Aplica delta sobre producto.stock_actual según tipo:
@@ -23,10 +48,9 @@ def _aplicar_delta_stock(producto: Producto, tipo: str, cantidad: int) -> None:
       SALIDA / MERMA: -cantidad
     """
     if tipo == "ENTRADA":
-        producto.stock_actual = (producto.stock_actual or 0) + cantidad
+        _mover_stock(producto, cantidad)
     else:  # SALIDA o MERMA
-        producto.stock_actual = (producto.stock_actual or 0) - cantidad
-    producto.save(update_fields=["stock_actual"])
+        _mover_stock(producto, -cantidad)
 
 
 def _revertir_movimiento(producto: Producto, tipo: str, cantidad: int) -> None:
@@ -35,10 +59,47 @@ def _revertir_movimiento(producto: Producto, tipo: str, cantidad: int) -> None:
       Si el anterior fue ENTRADA, ahora resta; si fue SALIDA/MERMA, ahora suma.
     """
     if tipo == "ENTRADA":
-        producto.stock_actual = (producto.stock_actual or 0) - cantidad
+        _mover_stock(producto, -cantidad)
     else:  # SALIDA o MERMA
-        producto.stock_actual = (producto.stock_actual or 0) + cantidad
-    producto.save(update_fields=["stock_actual"])
+        _mover_stock(producto, cantidad)
+
+
+# ───────────────────────────────────────────────────────────────────
+# Proyección de consultas para ?fields= / ?omit=
+# ───────────────────────────────────────────────────────────────────
+@lru_cache(maxsize=None)
+def _fuentes(serializer_class) -> dict:
+    """{campo del serializer: source} (se calcula una vez por clase)."""
+    return {nombre: campo.source for nombre, campo in serializer_class().fields.items()}
+
+
+def _proyectar(queryset, serializer_class, request):
+    """
+    Recorta el SELECT a los campos pedidos: only() de las columnas necesarias y
+    select_related solo de las relaciones que algún campo pedido atraviesa
+    (p.ej. sin categoria_nombre no se hace JOIN a categoría).
+    """
+    fuentes = _fuentes(serializer_class)
+    campos = campos_solicitados(request, list(fuentes))
+    if campos is None:
+        return queryset
+
+    meta = queryset.model._meta
+    rutas, relaciones = {meta.pk.name}, set()
+    for nombre in campos:
+        partes = fuentes[nombre].split(".")
+        try:
+            meta.get_field(partes[0])
+        except FieldDoesNotExist:
+            return queryset  # source no es un campo de modelo: no se puede proyectar
+        rutas.add(partes[0])
+        if len(partes) > 1:
+            relaciones.add(partes[0])
+            rutas.add("__".join(partes))
+    queryset = queryset.select_related(None)
+    if relaciones:  # select_related() sin argumentos seguiría TODAS las FK
+        queryset = queryset.select_related(*relaciones)
+    return queryset.only(*rutas)
 
 
 # ───────────────────────────────────────────────────────────────────
@@ -46,6 +107,14 @@ def _revertir_movimiento(producto: Producto, tipo: str, cantidad: int) -> None:
 # ───────────────────────────────────────────────────────────────────
 class BaseViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated, RolCompositePermission]
+    # Acciones cuyo queryset se recorta con ?fields= / ?omit=
+    acciones_proyectables = ("list", "retrieve")
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in self.acciones_proyectables:
+            queryset = _proyectar(queryset, self.get_serializer_class(), self.request)
+        return queryset
 
 
 # ───────────────────────────────────────────────────────────────────
@@ -75,21 +144,34 @@ class BodegaViewSet(BaseViewSet):
     ordering_fields = ["nombre"]
 
 
-class ProductoViewSet(BaseViewSet):
+class ProductoViewSet(GobernadorMixin, BaseViewSet):
     queryset = (
         Producto.objects.select_related("categoria", "proveedor")
         .all()
         .order_by("nombre")
     )
     serializer_class = ProductoSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [BusquedaAcotada, filters.OrderingFilter]
     search_fields = ["sku", "nombre", "categoria__nombre", "proveedor__razon_social"]
     ordering_fields = ["nombre", "stock_actual", "precio"]
+    acciones_proyectables = ("list", "retrieve", "bajo_stock")
+
+    # Releer con la fila bloqueada: la valorización calcula deltas desde el estado
+    # cargado y un movimiento concurrente pudo cambiar stock_actual (ver _mover_stock).
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.instance.refresh_from_db(from_queryset=Producto.objects.select_for_update())
+        super().perform_update(serializer)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.refresh_from_db(from_queryset=Producto.objects.select_for_update())
+        super().perform_destroy(instance)
 
     @action(detail=False, methods=["get"], url_path="bajo_stock")
     def bajo_stock(self, request):
         """
-        /productos/bajo_stock/?umbral=5
+        /productos/bajo_stock/?umbral=5&limit=100&offset=0
         """
         try:
             umbral = int(request.query_params.get("umbral", 5))
@@ -97,46 +179,74 @@ class ProductoViewSet(BaseViewSet):
             return Response({"detail": "umbral debe ser entero."}, status=status.HTTP_400_BAD_REQUEST)
 
         qs = self.get_queryset().filter(stock_actual__lt=umbral)
-        ser = self.get_serializer(qs, many=True)
-        return Response(ser.data)
+        ser = self.get_serializer(self.paginate_queryset(qs), many=True)
+        return self.get_paginated_response(ser.data)
 
     @action(detail=True, methods=["get"], url_path="historico")
     def historico(self, request, pk=None):
         """
-        /productos/<id>/historico/
+        /productos/<id>/historico/?limit=100&offset=0
         """
         producto = self.get_object()
         movimientos = (
             Movimiento.objects
             .filter(producto=producto)
-            .select_related("bodega")
+            .select_related("producto", "bodega")
             .order_by("-fecha", "-id")
         )
-        data = MovimientoSerializer(movimientos, many=True).data
+        movimientos = _proyectar(movimientos, MovimientoSerializer, request)
+        pagina = self.paginate_queryset(movimientos)
+        data = MovimientoSerializer(pagina, many=True, context={"request": request}).data
         return Response({
             "producto": f"{producto.sku} - {producto.nombre}",
+            "count": self.paginator.count,
+            "next": self.paginator.get_next_link(),
+            "previous": self.paginator.get_previous_link(),
             "historico": data
         })
 
+    # Agrega todo el histórico de la ventana: más tiempo que el resto de las lecturas
+    @action(detail=False, methods=["get"], url_path="sugerencias_reposicion", timeout_consulta_ms=30000)
+    def sugerencias_reposicion(self, request):
+        """
+        /productos/sugerencias_reposicion/?dias=60&ventana=7&plazo=7&objetivo=14
+        SKUs a reponer agrupados por proveedor, más urgentes primero (menos días de cobertura).
+        """
+        try:
+            params = {
+                clave: int(request.query_params.get(clave, defecto))
+                for clave, defecto in (("dias", 60), ("ventana", 7), ("plazo", 7), ("objetivo", 14))
+            }
+        except ValueError:
+            return Response({"detail": "dias, ventana, plazo y objetivo deben ser enteros."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if not (1 <= params["ventana"] <= params["dias"] <= 365) or params["plazo"] < 0 or params["objetivo"] < 0:
+            return Response({"detail": "Requiere 1 <= ventana <= dias <= 365, plazo y objetivo >= 0."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(reposicion.sugerencias(**params))
+
 
 # ───────────────────────────────────────────────────────────────────
 # Movimientos (ajustan stock_actual)
 # ───────────────────────────────────────────────────────────────────
-class MovimientoViewSet(BaseViewSet):
+class MovimientoViewSet(GobernadorMixin, BaseViewSet):
     queryset = (
         Movimiento.objects.select_related("producto", "bodega")
         .all()
         .order_by("-fecha", "-id")
     )
     serializer_class = MovimientoSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [BusquedaAcotada, filters.OrderingFilter]
     search_fields = ["producto__sku", "producto__nombre", "bodega__nombre", "tipo", "observacion"]
     ordering_fields = ["fecha", "id", "cantidad"]
 
+    @idempotente
     @transaction.atomic
     def create(self, request, *args, **kwargs):
         """
         Crea movimiento y aplica delta al stock_actual.
+        Acepta Idempotency-Key: un reintento con la misma clave no duplica el movimiento.
         """
         try:
             response = super().create(request, *args, **kwargs)
@@ -204,3 +314,38 @@ class MovimientoViewSet(BaseViewSet):
         except DjangoValidationError as e:
             transaction.set_rollback(True)
             return Response({"detail": e.messages}, status=status.HTTP_400_BAD_REQUEST)
+
+
+# ───────────────────────────────────────────────────────────────────
+# Reportes
+# ───────────────────────────────────────────────────────────────────
+class ReporteViewSet(viewsets.ViewSet):
+    permission_classes = [IsAuthenticated, RolCompositePermission]
+
+    @action(detail=False, methods=["get"], url_path="valorizacion")
+    def valorizacion(self, request):
+        """
+        /reportes/valorizacion/
+        Valor de inventario (precio × stock_actual) por categoría y proveedor,
+        leído de los totales corrientes (no agrega la tabla de productos).
+        """
+        return Response(valorizacion.leer())
+
+
+# ───────────────────────────────────────────────────────────────────
+# Auth
+# ───────────────────────────────────────────────────────────────────
+class JWTLogoutView(APIView):
+    """
+    POST /auth/jwt/logout/ con el access token de la sesión.
+    Revoca el refresh y todos los access tokens de esa sesión (claim "sid").
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        sid = request.auth.get("sid") if request.auth is not None else None
+        if not sid:
+            return Response({"detail": "El token no tiene sesión (sid) que revocar."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        revocar_sesion(sid)
+        return Response(status=status.HTTP_204_NO_CONTENT)